@@ -6,25 +6,43 @@ import argparse
 import os
 import threading
 import time
+from collections import OrderedDict, deque
 
 # Add current directory to path to ensure imports work
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from network import Network
-from game_data import BLOCKS as DEFAULT_BLOCKS, ITEMS as DEFAULT_ITEMS, GAMEVERSION
+from game_data import BLOCKS as DEFAULT_BLOCKS, ITEMS as DEFAULT_ITEMS, GAMEVERSION, BLOCK_REGISTRY, BlockRegistry
+from world_gen import get_biome
+from world_chunk import Chunk
+from texture_atlas import TextureAtlas, load_textures, render_tiles
+from hud import TextCache, HudPanel, FrameProfiler, FrameGraph
+from minimap import Minimap
+from collision import TileCollider
+from headless import HeadlessRun, add_headless_arguments
 
 # =====================
 # INITIAL SETUP
 # =====================
+headless_run = HeadlessRun.from_argv()  # --headless: offscreen, scripted input, frame-time report
 pygame.init()
 
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+if headless_run:
+    screen = headless_run.set_mode()
+else:
+    screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
 WIDTH, HEIGHT = screen.get_size()
 pygame.display.set_caption("Multiplayer Wizard Game")
 
 clock = pygame.time.Clock()
-FPS = 60
+FPS = 60  # Frame budget the HUD measures against
+MAX_FPS = FPS  # Render rate cap (0 = uncapped, --max-fps)
+
+# Physics runs in fixed steps whatever the frame rate; rendering interpolates between the last two
+SIM_RATE = 60  # Steps per second (the velocities in Player are per step)
+SIM_DT = 1 / SIM_RATE
+MAX_SIM_STEPS = 5  # Most steps run in one frame; beyond that the game slows down rather than spiral
 
 # =====================
 # CONSTANTS
@@ -36,7 +54,11 @@ CHUNK_SIZE = 16
 # =====================
 BLOCKS = {}  # Will be populated from server
 ITEMS = {}   # Will be populated from server
-BLOCK_ID_TO_NAME = {}  # Reverse lookup: id -> block_name
+block_registry = BLOCK_REGISTRY  # Id-indexed block properties, rebuilt from the server's BLOCKS
+block_textures = None  # {name: Surface} of the block textures found on disk, read once
+texture_atlas = None  # TextureAtlas of block_textures at the current render scale
+# Rect in texture_atlas per block_registry texture index (None if not loaded)
+TEXTURE_AREAS = [None] * len(block_registry.texture_names)
 
 # Block ID constants (same as in game_data.py)
 AIR = 0
@@ -51,15 +73,54 @@ WHITE = (255, 255, 255)
 PLAYER_COLOR = (0, 0, 255)
 OTHER_PLAYER_COLOR = (255, 0, 0)
 debug = False
+show_minimap = True  # Toggled with M
 selected_block = 1  # Default to dirt block ID
 
 # =====================
 # WORLD STORAGE
 # =====================
-world = {}
+world = {}  # {(chunk_x, chunk_y): Chunk}
+EMPTY_CHUNK = Chunk()  # Returned for chunks that haven't arrived yet (read-only)
 players = {}  # {player_id: player_data}
 requested_chunks = set()  # Track which chunks we've requested
+chunk_versions = {}  # {(chunk_x, chunk_y): server version of our copy}
+# Chunks unloaded for being far away, kept (LRU) so re-entering them only needs a delta
+stale_chunks = OrderedDict()
+MAX_STALE_CHUNKS = 1024
+UNLOAD_RADIUS = 6  # Chunks further than this from the player are unloaded
+
+# Pre-rendered chunk surfaces: {(chunk_x, chunk_y): (Chunk, Surface)}, least recently drawn first
+chunk_surfaces = OrderedDict()
+# The network thread never edits a chunk in world: it edits a copy and swaps it in, so the main
+# thread can't read a chunk halfway through a repack. A replaced chunk is re-rendered, except that
+# single block_change edits are queued here as (tile_x, tile_y, old Chunk, new Chunk) to be patched
+dirty_tiles = deque()
+CHUNK_SURFACE_MEMORY = 192 * 1024 * 1024  # Bytes of cached chunk surfaces before LRU eviction
+
+# The world is drawn at RENDER_SCALE of native resolution into the WorldView buffer and upscaled to
+# the screen once per frame; entities and the HUD are drawn on top at native resolution
+RENDER_SCALE = 1.0  # Highest scale used (--render-scale)
+DYNAMIC_SCALE = False  # Lower the scale while frames run over budget (--dynamic-scale)
+MIN_RENDER_SCALE = 0.5  # Dynamic scaling stops here
+RENDER_SCALE_STEP = 0.125  # One dynamic adjustment (5 pixels of tile size)
+SCALE_CHECK_INTERVAL = 1.0  # Seconds of frames averaged per dynamic adjustment
+RENDER_TILE = TILE_SIZE  # Tile size in pixels at the current render scale
+CHUNK_PIXELS = RENDER_TILE * CHUNK_SIZE  # Chunk surface size at the current render scale
 font = pygame.font.SysFont(None, 20)
+text_cache = TextCache(font)  # Player labels and HUD lines
+debug_panel = HudPanel(text_cache)
+
+# Performance overlay (shown with F3)
+PROFILE_PHASES = ("input", "physics", "chunks", "net", "draw_world", "entities", "hud", "flip")
+profiler = FrameProfiler(PROFILE_PHASES)
+perf_panel = HudPanel(text_cache, interval=0.5)
+frame_graph = FrameGraph((240, 60), 1 / FPS)
+PING_INTERVAL = 1.0  # Seconds between RTT pings to the server
+rtt_samples = deque(maxlen=16)  # Seconds
+chunk_request_times = {}  # {(chunk_x, chunk_y): perf_counter() when requested} awaiting a reply
+chunk_latencies = deque(maxlen=64)  # Seconds from get_chunk to its reply
+net_rates = {"time": None, "stats": None}  # Last traffic sample, for per-second rates
+minimap = None  # Minimap of the chunks around the player, made once block colors are known
 
 # =====================
 # NETWORKING
@@ -91,15 +152,55 @@ def network_handler():
                 cx = tx // CHUNK_SIZE
                 cy = ty // CHUNK_SIZE
                 
-                if (cx, cy) in world:
+                chunk = world.get((cx, cy))
+                if chunk is not None:
                     lx = tx % CHUNK_SIZE
                     ly = ty % CHUNK_SIZE
                     if 0 <= lx < CHUNK_SIZE and 0 <= ly < CHUNK_SIZE:
-                        world[(cx, cy)][ly][lx] = block_type
+                        edited = chunk.copy()
+                        edited.set(lx, ly, block_type)
+                        world[(cx, cy)] = edited
+                        dirty_tiles.append((tx, ty, chunk, edited))
+                        minimap.patch(tx, ty, block_type)
+                        update_chunk_version((cx, cy), data.get("version"))
+            
+            elif msg_type == "block_changes":
+                # Bulk edit to one chunk: (tile index, block id) byte pairs
+                key = (data["cx"], data["cy"])
+                chunk = world.get(key)
+                if chunk is not None:
+                    edited = chunk.copy()
+                    apply_changes(edited, data["changes"])
+                    world[key] = edited
+                    minimap.add(key, edited)
+                    update_chunk_version(key, data.get("version"))
+            
+            elif msg_type == "pong":
+                rtt_samples.append(time.perf_counter() - data["time"])
             
             elif msg_type == "chunk_data":
                 cx, cy = data["cx"], data["cy"]
-                world[(cx, cy)] = data["data"]
+                chunk_arrived((cx, cy))
+                world[(cx, cy)] = Chunk.from_bytes(data["data"])
+                minimap.add((cx, cy), world[(cx, cy)])
+                chunk_versions[(cx, cy)] = data.get("version", 0)
+                stale_chunks.pop((cx, cy), None)
+            
+            elif msg_type in ("chunk_up_to_date", "chunk_delta"):
+                # Answer to a get_chunk that sent our stale copy's version
+                key = (data["cx"], data["cy"])
+                chunk_arrived(key)
+                chunk = stale_chunks.pop(key, None)
+                if chunk is None:
+                    # Stale copy is gone (shouldn't happen): ask for the whole chunk
+                    network.send({"type": "get_chunk", "cx": key[0], "cy": key[1]})
+                    continue
+                if msg_type == "chunk_delta":
+                    chunk = chunk.copy()
+                    apply_changes(chunk, data["changes"])
+                    minimap.add(key, chunk)
+                world[key] = chunk
+                chunk_versions[key] = data["version"]
         
         except Exception as e:
             if not should_exit:
@@ -108,6 +209,21 @@ def network_handler():
         
         time.sleep(0.01)
 
+def apply_changes(chunk, changes):
+    """Apply (tile index, block id) byte pairs from block_changes/chunk_delta"""
+    for i in range(0, len(changes), 2):
+        chunk.set(changes[i] % CHUNK_SIZE, changes[i] // CHUNK_SIZE, changes[i + 1])
+
+def chunk_arrived(key):
+    requested_at = chunk_request_times.pop(key, None)
+    if requested_at is not None:
+        chunk_latencies.append(time.perf_counter() - requested_at)
+
+def update_chunk_version(key, version):
+    # Broadcasts and chunk_data can arrive in either order; keep the newest
+    if version is not None and version > chunk_versions.get(key, 0):
+        chunk_versions[key] = version
+
 def get_tile_from_mouse(cam_x, cam_y):
     mx, my = pygame.mouse.get_pos()
     world_x = mx + cam_x
@@ -130,7 +246,7 @@ def draw_placement_preview(surface, cam_x, cam_y, player):
         TILE_SIZE,
     )
 
-    pygame.draw.rect(surface, (0, 255, 0), rect, 2)
+    return pygame.draw.rect(surface, (0, 255, 0), rect, 2)
 
 def place_block(tile_x, tile_y, block_type):
     if network:
@@ -186,7 +302,7 @@ def generate_tree(tiles, x, y):
 
     for i in range(height):
         if y - i >= 0:
-            tiles[y - i][x] = WOOD_TILE
+            tiles.set(x, y - i, WOOD_TILE)
 
     leaf_start = y - height
     for lx in range(-2, 3):
@@ -195,11 +311,11 @@ def generate_tree(tiles, x, y):
                 tx = x + lx
                 ty = leaf_start + ly
                 if 0 <= tx < CHUNK_SIZE and 0 <= ty < CHUNK_SIZE:
-                    if tiles[ty][tx] == AIR:
-                        tiles[ty][tx] = LEAF_TILE
+                    if tiles.get(tx, ty) == AIR:
+                        tiles.set(tx, ty, LEAF_TILE)
 
 def generate_chunk(cx, cy):
-    tiles = [[AIR for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
+    tiles = Chunk()
 
     for y in range(CHUNK_SIZE):
         for x in range(CHUNK_SIZE):
@@ -208,11 +324,11 @@ def generate_chunk(cx, cy):
             ground_height = get_height(global_x)
             if global_y > ground_height:
                 if global_y == ground_height + 1 and random.random() < 0.7:
-                    tiles[y][x] = GRASS_TILE
+                    tiles.set(x, y, GRASS_TILE)
                 elif global_y > ground_height + 4:
-                    tiles[y][x] = STONE_TILE if random.random() > 0.05 else DIRT_TILE
+                    tiles.set(x, y, STONE_TILE if random.random() > 0.05 else DIRT_TILE)
                 else:
-                   tiles[y][x] = STONE_TILE if random.random() < 0.35 else DIRT_TILE
+                   tiles.set(x, y, STONE_TILE if random.random() < 0.35 else DIRT_TILE)
 
     for x in range(CHUNK_SIZE):
         global_x = cx * CHUNK_SIZE + x
@@ -224,53 +340,32 @@ def generate_chunk(cx, cy):
 
     return tiles
 
+def request_chunk(cx, cy):
+    """Ask the server for a chunk; with a stale copy, only for what changed since its version"""
+    requested_chunks.add((cx, cy))
+    message = {
+        "type": "get_chunk",
+        "cx": cx,
+        "cy": cy
+    }
+    if (cx, cy) in stale_chunks and (cx, cy) in chunk_versions:
+        message["version"] = chunk_versions[(cx, cy)]
+    chunk_request_times[(cx, cy)] = time.perf_counter()
+    network.send(message)
+
 def get_chunk(cx, cy):
     if (cx, cy) not in world:
         if network and (cx, cy) not in requested_chunks:
-            requested_chunks.add((cx, cy))
-            network.send({
-                "type": "get_chunk",
-                "cx": cx,
-                "cy": cy
-            })
+            request_chunk(cx, cy)
         else:
             world[(cx, cy)] = generate_chunk(cx, cy)
-    return world.get((cx, cy), [[AIR for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)])
+    return world.get((cx, cy), EMPTY_CHUNK)
 
 # =====================
 # TILE COLLISION HELPERS
 # =====================
-def get_nearby_tiles(rect):
-    """Get all solid tiles near the player for collision detection"""
-    tiles = []
-
-    # Check a larger area around the player to catch all potential collisions
-    # Especially important for blocks above (roof collision)
-    start_x = rect.left // TILE_SIZE - 1
-    end_x = rect.right // TILE_SIZE + 2
-    start_y = rect.top // TILE_SIZE - 2  # Check 2 tiles above for roof collisions
-    end_y = rect.bottom // TILE_SIZE + 2
-
-    for ty in range(start_y, end_y):
-        for tx in range(start_x, end_x):
-            cx = tx // CHUNK_SIZE
-            cy = ty // CHUNK_SIZE
-            chunk = get_chunk(cx, cy)
-
-            lx = tx % CHUNK_SIZE
-            ly = ty % CHUNK_SIZE
-
-            if 0 <= lx < CHUNK_SIZE and 0 <= ly < CHUNK_SIZE:
-                if chunk[ly][lx] != AIR:
-                    tiles.append(
-                        pygame.Rect(
-                            tx * TILE_SIZE,
-                            ty * TILE_SIZE,
-                            TILE_SIZE,
-                            TILE_SIZE,
-                        )
-                    )
-    return tiles
+# Solid tile tests for Player.move; made once block definitions arrive
+collider = None
 
 # =====================
 # PLAYER
@@ -278,10 +373,23 @@ def get_nearby_tiles(rect):
 class Player:
     def __init__(self):
         self.rect = pygame.Rect(100, 100, 30, 50)
+        self.prev_pos = self.rect.topleft  # Position before the last step, for interpolation
         self.vel_x = 0
         self.vel_y = 0
         self.on_ground = False
 
+    def step(self):
+        """One fixed simulation step"""
+        self.prev_pos = self.rect.topleft
+        self.handle_input()
+        self.apply_gravity()
+        self.move()
+
+    def render_pos(self, alpha):
+        """Position alpha (0..1) of the way from the previous step to the current one"""
+        x0, y0 = self.prev_pos
+        return (round(x0 + (self.rect.x - x0) * alpha), round(y0 + (self.rect.y - y0) * alpha))
+
     def handle_input(self):
         keys = pygame.key.get_pressed()
         self.vel_x = 0
@@ -300,36 +408,25 @@ class Player:
             self.vel_y = 12
 
     def move(self):
-        self.rect.x += self.vel_x
-        self.collide(self.vel_x, 0)
-
-        self.rect.y += self.vel_y
-        self.on_ground = False
-        self.collide(0, self.vel_y)
-
-    def collide(self, dx, dy):
-        for tile in get_nearby_tiles(self.rect):
-            if self.rect.colliderect(tile):
-                if dx > 0:  # Moving right
-                    self.rect.right = tile.left
-                elif dx < 0:  # Moving left
-                    self.rect.left = tile.right
-                elif dy > 0:  # Moving down
-                    self.rect.bottom = tile.top
-                    self.vel_y = 0
-                    self.on_ground = True
-                elif dy < 0:  # Moving up - STOP IMMEDIATELY
-                    self.rect.top = tile.bottom
-                    self.vel_y = 0
-                    # Continue checking for more collisions above
-
-    def draw(self, surface, cam_x, cam_y, color=PLAYER_COLOR):
-        pygame.draw.rect(
+        rect = self.rect
+        rect.x, _ = collider.sweep_x(rect.x, rect.y, rect.width, rect.height, self.vel_x)
+
+        # vel_y is fractional: let Rect round the target as it always has, then sweep there
+        y = rect.y
+        rect.y += self.vel_y
+        rect.y, hit = collider.sweep_y(rect.x, y, rect.width, rect.height, rect.y - y)
+        self.on_ground = hit and self.vel_y > 0
+        if hit:
+            self.vel_y = 0
+
+    def draw(self, surface, cam_x, cam_y, color=PLAYER_COLOR, pos=None):
+        x, y = pos or self.rect.topleft
+        return pygame.draw.rect(
             surface,
             color,
             pygame.Rect(
-                self.rect.x - cam_x,
-                self.rect.y - cam_y,
+                x - cam_x,
+                y - cam_y,
                 self.rect.width,
                 self.rect.height,
             ),
@@ -337,19 +434,13 @@ class Player:
 
 def get_block_color(block_id):
     """Get color for a block from definitions"""
-    block_name = BLOCK_ID_TO_NAME.get(block_id)
-    if block_name and block_name in BLOCKS:
-        return tuple(BLOCKS[block_name]["color"])
-    return (128, 128, 128)  # Default gray if not found
+    return block_registry.colors[block_id] or (128, 128, 128)  # Default gray if not found
 
 def get_block_name(block_id):
     """Get name for a block from definitions"""
-    block_name = BLOCK_ID_TO_NAME.get(block_id)
-    if block_name and block_name in BLOCKS:
-        return BLOCKS[block_name]["name"]
-    return "Unknown"
+    return block_registry.names[block_id] or "Unknown"
 
-def draw_debug(surface, player, cam_x, cam_y, clock):
+def debug_lines(player, cam_x, cam_y, clock):
     mx, my = pygame.mouse.get_pos()
     world_mx = mx + cam_x
     world_my = my + cam_y
@@ -364,51 +455,11 @@ def draw_debug(surface, player, cam_x, cam_y, clock):
     ly = tile_y % CHUNK_SIZE
     block_at_mouse = 0
     if 0 <= lx < CHUNK_SIZE and 0 <= ly < CHUNK_SIZE:
-        block_at_mouse = chunk[ly][lx]
-
-    # Calculate current biome
-    try:
-        import math
-        def hash_function_local(x):
-            """True random hash without sine"""
-            x = int(x)
-            x = (x ^ 61) ^ (x >> 13)
-            x = x * 2654435769
-            x = x ^ (x >> 16)
-            return (x & 0x7fffffff) / 2147483647.0
-        
-        def linear_interpolate_local(t):
-            """Linear interpolation"""
-            return t
-        
-        def value_noise_local(x, scale=1.0):
-            """Generate value noise with less smoothing"""
-            x_scaled = x / scale
-            xi = math.floor(x_scaled)
-            xf = x_scaled - xi
-            
-            n0 = hash_function_local(xi)
-            n1 = hash_function_local(xi + 1)
-            
-            u = linear_interpolate_local(xf)
-            return n0 * (1 - u) + n1 * u
-        
-        player_world_x = player.rect.centerx // TILE_SIZE
-        biome_noise = value_noise_local(player_world_x, 300) * 100
-        biome_noise += value_noise_local(player_world_x + 5000, 150) * 50
-        
-        if biome_noise > 110:
-            current_biome = "Desert"
-        elif biome_noise > 70:
-            current_biome = "Plains"
-        elif biome_noise > 30:
-            current_biome = "Forest"
-        elif biome_noise > -10:
-            current_biome = "Mountain"
-        else:
-            current_biome = "Ice Plains"
-    except:
-        current_biome = "Unknown"
+        block_at_mouse = chunk.get(lx, ly)
+
+    # Current biome (shares the cached column lookup with world generation)
+    player_world_x = player.rect.centerx // TILE_SIZE
+    current_biome = get_biome(player_world_x).replace("_", " ").title()
     
     lines = [
         f"FPS: {int(clock.get_fps())}",
@@ -418,6 +469,7 @@ def draw_debug(surface, player, cam_x, cam_y, clock):
         f"Chunk X: {player.rect.centerx // (TILE_SIZE * CHUNK_SIZE)}",
         f"Chunk Y: {player.rect.centery // (TILE_SIZE * CHUNK_SIZE)}",
         f"Loaded Chunks: {len(world)}",
+        f"Chunk Surfaces: {len(chunk_surfaces)} ({chunk_surface_memory() / (1024 * 1024):.0f} MB)",
         f"Players Connected: {len(players)}",
         f"Biome: {current_biome}",
         "",
@@ -434,55 +486,316 @@ def draw_debug(surface, player, cam_x, cam_y, clock):
         for pid, player_data in players.items():
             if pid != player_id:
                 lines.append(f"  Player {pid}: ({player_data['x']}, {player_data['y']})")
+    return lines
+
+def perf_lines():
+    """Per-phase frame timings and network stats for the performance overlay"""
+    lines = [f"Frame phases (ms, last {profiler.frame_times.maxlen} frames):"]
+    for phase, seconds in profiler.averages().items():
+        lines.append(f"  {phase}: {seconds * 1000:.2f}")
+    frame_times = sorted(profiler.frame_times)
+    if frame_times:
+        lines.append(f"  total: {sum(frame_times) / len(frame_times) * 1000:.2f} avg, "
+                     f"{frame_times[len(frame_times) * 99 // 100] * 1000:.2f} p99, {frame_times[-1] * 1000:.2f} max")
+
+    lines.append("")
+    if network:
+        now = time.perf_counter()
+        stats = network.stats()
+        if net_rates["time"] is not None and now > net_rates["time"]:
+            elapsed = now - net_rates["time"]
+            rate = {key: (stats[key] - net_rates["stats"][key]) / elapsed for key in stats}
+            lines.append(f"Net in: {rate['messages_received']:.0f} msg/s, {rate['bytes_received'] / 1024:.1f} KB/s")
+            lines.append(f"Net out: {rate['messages_sent']:.0f} msg/s, {rate['bytes_sent'] / 1024:.1f} KB/s")
+        net_rates["time"], net_rates["stats"] = now, stats
+    render_width, render_height = render_size()
+    lines.append(f"Render scale: {RENDER_TILE / TILE_SIZE:.3f} ({render_width}x{render_height}"
+                 f"{', dynamic' if DYNAMIC_SCALE else ''})")
+    lines.append(f"Pending chunk requests: {len(chunk_request_times)}")
+    if chunk_latencies:
+        latencies = list(chunk_latencies)
+        lines.append(f"Chunk latency: {sum(latencies) / len(latencies) * 1000:.1f} ms avg, {max(latencies) * 1000:.1f} max")
+    if rtt_samples:
+        lines.append(f"RTT: {rtt_samples[-1] * 1000:.1f} ms (min {min(rtt_samples) * 1000:.1f})")
+    return lines
 
-    y = 10
-    for line in lines:
-        text = font.render(line, True, (0, 0, 0))
-        surface.blit(text, (10, y))
-        y += 18
+def draw_debug(surface, player, cam_x, cam_y, clock):
+    """Draw the F3 overlays (their text is refreshed every HUD_UPDATE_INTERVAL); returns the rects drawn"""
+    rects = [debug_panel.draw(surface, (10, 10), lambda: debug_lines(player, cam_x, cam_y, clock))]
+    x = surface.get_width() - frame_graph.surface.get_width() - 10
+    rects.append(frame_graph.draw(surface, (x, 10), profiler.frame_times))
+    rects.append(perf_panel.draw(surface, (x, 20 + frame_graph.surface.get_height()), perf_lines))
+    return rects
 
 # =====================
 # RENDERING
 # =====================
-def draw_world(surface, cam_x, cam_y):
-    start_x = cam_x // TILE_SIZE - 1
-    end_x = (cam_x + WIDTH) // TILE_SIZE + 1
-    start_y = cam_y // TILE_SIZE - 1
-    end_y = (cam_y + HEIGHT) // TILE_SIZE + 1
-
-    for ty in range(start_y, end_y):
-        for tx in range(start_x, end_x):
-            cx = tx // CHUNK_SIZE
-            cy = ty // CHUNK_SIZE
-            chunk = get_chunk(cx, cy)
-
-            lx = tx % CHUNK_SIZE
-            ly = ty % CHUNK_SIZE
-
-            if 0 <= lx < CHUNK_SIZE and 0 <= ly < CHUNK_SIZE:
-                tile_id = chunk[ly][lx]
-                
-                # Look up block by ID from the definitions
-                block_name = BLOCK_ID_TO_NAME.get(tile_id)
-                if not block_name or tile_id == 0:  # Skip air blocks
-                    continue
-                
-                block_def = BLOCKS.get(block_name)
-                if not block_def:
-                    continue
-                
-                color = tuple(block_def["color"])
+def load_block_textures():
+    """Pack the registry's textures into texture_atlas; blocks without one are drawn in their color"""
+    global block_textures, texture_atlas, TEXTURE_AREAS
+    if block_textures is None:
+        # Only the first call reads the PNGs: a render scale change just re-packs them
+        block_textures = load_textures(block_registry.texture_names)
+    texture_atlas = TextureAtlas(block_textures, RENDER_TILE)
+    TEXTURE_AREAS = [texture_atlas.area(name) for name in block_registry.texture_names]
+
+def set_render_scale(scale):
+    """Draw the world with tiles scale times their native size; returns False if that is the current size.
+
+    Cached chunk surfaces and the texture atlas are dropped and rebuilt at
+    the new tile size (from the textures already in memory); the caller
+    replaces its WorldView.
+    """
+    global RENDER_TILE, CHUNK_PIXELS
+    tile = max(1, min(TILE_SIZE, round(TILE_SIZE * scale)))
+    if tile == RENDER_TILE and texture_atlas is not None:
+        return False
+    RENDER_TILE = tile
+    CHUNK_PIXELS = tile * CHUNK_SIZE
+    chunk_surfaces.clear()
+    load_block_textures()
+    return True
 
-                pygame.draw.rect(
-                    surface,
-                    color,
-                    pygame.Rect(
-                        tx * TILE_SIZE - cam_x,
-                        ty * TILE_SIZE - cam_y,
-                        TILE_SIZE,
-                        TILE_SIZE,
-                    ),
-                )
+def render_size():
+    """Size of the world buffer at the current render scale"""
+    return (-(-WIDTH * RENDER_TILE // TILE_SIZE), -(-HEIGHT * RENDER_TILE // TILE_SIZE))
+
+def tile_color(tile_id):
+    """Color a tile is drawn in, or None for air and unknown blocks (left as background)"""
+    return None if tile_id == AIR else block_registry.colors[tile_id]
+
+def tile_texture(tile_id):
+    """Rect of a tile's texture in texture_atlas, or None to draw it in its color"""
+    index = block_registry.textures[tile_id]
+    return None if index is None else TEXTURE_AREAS[index]
+
+def render_chunk_surface(chunk):
+    """Draw a whole chunk onto a new opaque surface (air and unknown blocks left WHITE)"""
+    surface = pygame.Surface((CHUNK_PIXELS, CHUNK_PIXELS)).convert()
+    surface.fill(WHITE)
+    # Only the chunk's palette needs resolving; textures where loaded, colors otherwise
+    colors = {}
+    textures = {}
+    for tile_id in chunk.palette:
+        color = tile_color(tile_id)
+        if color is not None:
+            colors[tile_id] = color
+            area = tile_texture(tile_id)
+            if area is not None:
+                textures[tile_id] = area
+    if colors:
+        render_tiles(surface, chunk.to_raw(), CHUNK_SIZE, RENDER_TILE, colors, textures, texture_atlas.surface if textures else None)
+    return surface
+
+def get_chunk_surface(key, chunk):
+    """Cached surface for a chunk, re-rendered if the chunk was replaced or edited"""
+    entry = chunk_surfaces.get(key)
+    if entry is not None and entry[0] is chunk:
+        chunk_surfaces.move_to_end(key)
+        return entry[1]
+    surface = render_chunk_surface(chunk)
+    chunk_surfaces[key] = (chunk, surface)
+    chunk_surfaces.move_to_end(key)
+    return surface
+
+def chunk_surface_memory():
+    return sum(surface.get_bytesize() * CHUNK_PIXELS * CHUNK_PIXELS for _, surface in chunk_surfaces.values())
+
+def evict_chunk_surfaces(keep):
+    """Drop least recently drawn surfaces over CHUNK_SURFACE_MEMORY, never the `keep` newest"""
+    if not chunk_surfaces:
+        return
+    surface_bytes = next(iter(chunk_surfaces.values()))[1].get_bytesize() * CHUNK_PIXELS * CHUNK_PIXELS
+    limit = max(keep, CHUNK_SURFACE_MEMORY // surface_bytes)
+    while len(chunk_surfaces) > limit:
+        chunk_surfaces.popitem(last=False)
+
+def visible_chunks(cam_x, cam_y, area):
+    """(cx, cy) of every chunk overlapping area, a rect in buffer coordinates"""
+    start_cx = (cam_x + area.left) // CHUNK_PIXELS
+    end_cx = (cam_x + area.right - 1) // CHUNK_PIXELS
+    start_cy = (cam_y + area.top) // CHUNK_PIXELS
+    end_cy = (cam_y + area.bottom - 1) // CHUNK_PIXELS
+    return [(cx, cy) for cy in range(start_cy, end_cy + 1) for cx in range(start_cx, end_cx + 1)]
+
+def draw_world(surface, cam_x, cam_y, area=None):
+    """Redraw the world inside area (default: all of surface) from the cached chunk surfaces"""
+    if area is None:
+        area = surface.get_rect()
+    surface.set_clip(area)
+    surface.fill(WHITE)
+    for cx, cy in visible_chunks(cam_x, cam_y, area):
+        chunk = get_chunk(cx, cy)
+        if chunk.bits == 0 and chunk.palette[0] == AIR:
+            continue  # All air: nothing over the background
+        surface.blit(get_chunk_surface((cx, cy), chunk), (cx * CHUNK_PIXELS - cam_x, cy * CHUNK_PIXELS - cam_y))
+    surface.set_clip(None)
+
+class WorldView:
+    """The world as last drawn, kept in a backbuffer so frames only redraw what changed.
+
+    When the camera pans the buffer is scrolled in place and only the newly
+    exposed strips are drawn; replaced chunks and edited tiles are redrawn
+    where they are. present() composites entities and the HUD on top and,
+    while the camera holds still, updates only the rects that changed.
+
+    Below render scale 1 the buffer is smaller than the screen (tiles are
+    RENDER_TILE pixels) and is upscaled into a screen-sized copy whenever
+    it changed, which present() then shows as it would the buffer.
+    """
+
+    def __init__(self, screen_size):
+        self.buffer = pygame.Surface(render_size()).convert()
+        self.rect = self.buffer.get_rect()
+        self.upscaled = None if self.rect.size == screen_size else pygame.Surface(screen_size).convert()
+        self.cam = None  # Camera the buffer was drawn for, in buffer pixels
+        self.drawn = {}  # {(cx, cy): Chunk} on screen, as drawn into the buffer
+        self.overlay_rects = []  # Screen rects drawn over the buffer last frame
+
+    def update(self, cam_x, cam_y):
+        """Bring the buffer up to date for this camera (in world pixels).
+
+        Returns the screen rects that changed, or None if the whole view did.
+        """
+        cam_x = cam_x * RENDER_TILE // TILE_SIZE
+        cam_y = cam_y * RENDER_TILE // TILE_SIZE
+        regions = []
+        scrolled = self.cam is not None and self.cam != (cam_x, cam_y)
+        if self.cam is None:
+            regions.append(self.rect)
+        elif scrolled:
+            dx, dy = cam_x - self.cam[0], cam_y - self.cam[1]
+            width, height = self.rect.size
+            if abs(dx) >= width or abs(dy) >= height:
+                regions.append(self.rect)
+            else:
+                self.buffer.scroll(-dx, -dy)
+                if dx:
+                    regions.append(pygame.Rect(width - dx if dx > 0 else 0, 0, abs(dx), height))
+                if dy:
+                    regions.append(pygame.Rect(0, height - dy if dy > 0 else 0, width, abs(dy)))
+        self.cam = (cam_x, cam_y)
+
+        while dirty_tiles:
+            regions.append(self._patch_tile(*dirty_tiles.popleft()))
+
+        # Chunks that arrived or were replaced since they were drawn
+        drawn = {}
+        for key in visible_chunks(cam_x, cam_y, self.rect):
+            chunk = get_chunk(*key)
+            drawn[key] = chunk
+            if self.drawn.get(key) is not chunk:
+                regions.append(pygame.Rect(
+                    key[0] * CHUNK_PIXELS - cam_x, key[1] * CHUNK_PIXELS - cam_y, CHUNK_PIXELS, CHUNK_PIXELS
+                ).clip(self.rect))
+        self.drawn = drawn
+
+        regions = [area for area in regions if area]
+        for area in regions:
+            draw_world(self.buffer, cam_x, cam_y, area)
+        evict_chunk_surfaces(len(drawn))
+        if self.upscaled is not None:
+            if not regions and not scrolled:
+                return []
+            pygame.transform.scale(self.buffer, self.upscaled.get_size(), self.upscaled)
+            return None
+        return None if scrolled or self.rect in regions else regions
+
+    def _patch_tile(self, tx, ty, old, new):
+        """Redraw one edited tile in the cached surface of old, handing it over to new; returns its buffer rect.
+
+        If the surface was rendered from some other copy of the chunk it is
+        left alone, and the chunk is re-rendered when next drawn.
+        """
+        key = (tx // CHUNK_SIZE, ty // CHUNK_SIZE)
+        entry = chunk_surfaces.get(key)
+        if entry is not None and entry[0] is old:
+            chunk_surfaces[key] = (new, entry[1])
+            if self.drawn.get(key) is old:
+                self.drawn[key] = new
+            lx, ly = tx % CHUNK_SIZE, ty % CHUNK_SIZE
+            tile_id = new.get(lx, ly)
+            color = tile_color(tile_id)
+            area = tile_texture(tile_id) if color is not None else None
+            tile_rect = (lx * RENDER_TILE, ly * RENDER_TILE, RENDER_TILE, RENDER_TILE)
+            if area is not None:
+                entry[1].blit(texture_atlas.surface, tile_rect, area)
+            else:
+                entry[1].fill(WHITE if color is None else color, tile_rect)
+        return pygame.Rect(
+            tx * RENDER_TILE - self.cam[0], ty * RENDER_TILE - self.cam[1], RENDER_TILE, RENDER_TILE
+        ).clip(self.rect)
+
+    def present(self, screen, changed, draw_overlays):
+        """Show the buffer with draw_overlays(screen) (returning its rects) drawn on top"""
+        frame = self.buffer if self.upscaled is None else self.upscaled
+        if changed is None:
+            screen.blit(frame, (0, 0))
+            self.overlay_rects = draw_overlays(screen)
+            pygame.display.flip()
+            return
+        # Camera held still: restore what the overlays covered last frame, then only update what changed
+        dirty = changed + self.overlay_rects
+        for rect in dirty:
+            screen.blit(frame, rect, rect)
+        self.overlay_rects = draw_overlays(screen)
+        dirty += self.overlay_rects
+        if dirty:
+            pygame.display.update(dirty)
+
+class DynamicScale:
+    """Steps the render scale down while frames run over budget and back up once there is headroom.
+
+    Frame times are the profiler's work times, so waiting on the frame cap
+    doesn't count. They are averaged over SCALE_CHECK_INTERVAL and at most
+    one step is taken per interval; the interval after a step is ignored,
+    since re-rendering every chunk surface at the new size makes it slow
+    by itself. Scaling back up needs a few quiet intervals in a row.
+    """
+
+    def __init__(self, budget, max_scale, min_scale=MIN_RENDER_SCALE, step=RENDER_SCALE_STEP, headroom=0.5, patience=3):
+        self.budget = budget
+        self.max_scale = max_scale
+        self.min_scale = min(min_scale, max_scale)
+        self.step = step
+        self.headroom = headroom  # Scale up when frames average under this fraction of the budget
+        self.patience = patience  # Intervals in a row that must have headroom
+        self.scale = max_scale
+        self.total = 0.0
+        self.frames = 0
+        self.quiet = 0
+        self.settling = False
+        self.next_check = time.perf_counter() + SCALE_CHECK_INTERVAL
+
+    def update(self, frame_time):
+        """Record a frame; returns the new scale when it should change, else None"""
+        self.total += frame_time
+        self.frames += 1
+        now = time.perf_counter()
+        if now < self.next_check:
+            return None
+        average = self.total / self.frames
+        self.total, self.frames = 0.0, 0
+        self.next_check = now + SCALE_CHECK_INTERVAL
+        if self.settling:
+            self.settling = False
+            return None
+        scale = self.scale
+        if average > self.budget:
+            self.quiet = 0
+            scale = max(self.min_scale, scale - self.step)
+        elif average < self.budget * self.headroom:
+            self.quiet += 1
+            if self.quiet >= self.patience:
+                self.quiet = 0
+                scale = min(self.max_scale, scale + self.step)
+        else:
+            self.quiet = 0
+        if scale == self.scale:
+            return None
+        self.scale = scale
+        self.settling = True
+        return scale
 
 def preload_chunks(player, radius=2):
     """Preload chunks around the player to prevent gaps"""
@@ -492,16 +805,29 @@ def preload_chunks(player, radius=2):
     for cx in range(px - radius, px + radius + 1):
         for cy in range(py - radius, py + radius + 1):
             if (cx, cy) not in world and (cx, cy) not in requested_chunks:
-                requested_chunks.add((cx, cy))
                 if network:
-                    network.send({
-                        "type": "get_chunk",
-                        "cx": cx,
-                        "cy": cy
-                    })
+                    request_chunk(cx, cy)
+                else:
+                    requested_chunks.add((cx, cy))
+
+def unload_far_chunks(player, radius=UNLOAD_RADIUS):
+    """Move chunks far from the player out of the world into stale_chunks"""
+    px = player.rect.centerx // (TILE_SIZE * CHUNK_SIZE)
+    py = player.rect.centery // (TILE_SIZE * CHUNK_SIZE)
+    # list(world) is one call under the GIL; iterating world itself would race
+    # the network thread adding chunks to it
+    far = [key for key in list(world) if abs(key[0] - px) > radius or abs(key[1] - py) > radius]
+    for key in far:
+        stale_chunks[key] = world.pop(key)
+        requested_chunks.discard(key)
+    while len(stale_chunks) > MAX_STALE_CHUNKS:
+        key, _ = stale_chunks.popitem(last=False)
+        chunk_versions.pop(key, None)
+        minimap.discard(key)
 
 def draw_other_players(surface, cam_x, cam_y, player):
-    """Draw all other players"""
+    """Draw all other players; returns the rects drawn"""
+    rects = []
     for pid, player_data in players.items():
         if pid == player_id:
             continue
@@ -509,7 +835,7 @@ def draw_other_players(surface, cam_x, cam_y, player):
         x = player_data["x"]
         y = player_data["y"]
         
-        pygame.draw.rect(
+        rects.append(pygame.draw.rect(
             surface,
             OTHER_PLAYER_COLOR,
             pygame.Rect(
@@ -518,17 +844,18 @@ def draw_other_players(surface, cam_x, cam_y, player):
                 30,
                 50,
             ),
-        )
+        ))
         
         # Draw player ID above player
-        text = font.render(f"P{pid}", True, (0, 0, 0))
-        surface.blit(text, (x - cam_x - 10, y - cam_y - 20))
+        text = text_cache.render(f"P{pid}")
+        rects.append(surface.blit(text, (x - cam_x - 10, y - cam_y - 20)))
+    return rects
 
 # =====================
 # MAIN LOOP
 # =====================
 def main(server_host="localhost", server_port=5555):
-    global network, player_id, network_thread, should_exit, world, BLOCKS, ITEMS
+    global network, player_id, network_thread, should_exit, world, BLOCKS, ITEMS, block_registry, minimap, collider
     
     # Connect to server
     network = Network()
@@ -568,10 +895,12 @@ def main(server_host="localhost", server_port=5555):
     block_data = network.receive_blocking()
     if block_data and block_data.get("type") == "block_definitions":
         BLOCKS = block_data["blocks"]
-        # Create reverse lookup
-        for block_name, block_data_item in BLOCKS.items():
-            BLOCK_ID_TO_NAME[block_data_item["id"]] = block_name
+        block_registry = BlockRegistry(BLOCKS)
         print(f"Loaded {len(BLOCKS)} block definitions")
+        set_render_scale(RENDER_SCALE)
+        print(f"Loaded {len(texture_atlas)} block textures")
+        minimap = Minimap([tile_color(block_id) for block_id in range(BlockRegistry.SIZE)], WHITE)
+        collider = TileCollider(get_chunk, block_registry.solid, TILE_SIZE)
     else:
         print(f"Failed to receive block definitions")
         return
@@ -596,16 +925,32 @@ def main(server_host="localhost", server_port=5555):
     network_thread.start()
     
     player = Player()
+    view = WorldView((WIDTH, HEIGHT))
+    scaler = DynamicScale(1 / FPS, RENDER_SCALE) if DYNAMIC_SCALE else None
     running = True
     
     # Optimization: Track last position for network updates (only send when changed)
     last_player_x = player.rect.x
     last_player_y = player.rect.y
     network_update_counter = 0
-    network_update_interval = 5  # Send network updates every 5 frames instead of every frame
+    network_update_interval = 5  # Send network updates every 5 steps instead of every step
+    next_ping = 0.0
+    accumulator = 0.0
+    last_frame = time.perf_counter()
+    cam_x = cam_y = 0
 
     while running:
-        clock.tick(FPS)
+        clock.tick(MAX_FPS)
+        # Seconds to simulate (tick() only has millisecond resolution); capped so a
+        # long stall doesn't trigger a burst of catch-up steps
+        now = time.perf_counter()
+        accumulator = min(accumulator + now - last_frame, MAX_SIM_STEPS * SIM_DT)
+        last_frame = now
+        profiler.start()
+        if scaler and profiler.frame_times:
+            scale = scaler.update(profiler.frame_times[-1])
+            if scale is not None and set_render_scale(scale):
+                view = WorldView((WIDTH, HEIGHT))
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -614,6 +959,11 @@ def main(server_host="localhost", server_port=5555):
                 if event.key == pygame.K_F3:
                     global debug
                     debug = not debug
+                    debug_panel.invalidate()
+                    perf_panel.invalidate()
+                if event.key == pygame.K_m:
+                    global show_minimap
+                    show_minimap = not show_minimap
                 if event.key == pygame.K_ESCAPE:
                     running = False
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -626,18 +976,29 @@ def main(server_host="localhost", server_port=5555):
                     if can_place(player, tx, ty):
                         place_block(tx, ty, AIR)
 
-        player.handle_input()
-        player.apply_gravity()
-        player.move()
+        profiler.mark("input")
+        steps = 0
+        while accumulator >= SIM_DT:
+            collider.clear()  # Chunks may have arrived or been replaced since the last step
+            player.step()
+            accumulator -= SIM_DT
+            steps += 1
+        profiler.mark("physics")
         
         # Preload chunks around the player
         preload_chunks(player, radius=2)
-
-        cam_x = player.rect.centerx - WIDTH // 2
-        cam_y = player.rect.centery - HEIGHT // 2
-
-        # Optimization: Only send network updates every N frames and when position changed
-        network_update_counter += 1
+        if network_update_counter == 0:
+            unload_far_chunks(player)
+        if show_minimap:
+            minimap.update((player.rect.centerx // (TILE_SIZE * CHUNK_SIZE), player.rect.centery // (TILE_SIZE * CHUNK_SIZE)))
+        profiler.mark("chunks")
+
+        render_pos = player.render_pos(accumulator / SIM_DT)
+        cam_x = render_pos[0] + player.rect.width // 2 - WIDTH // 2
+        cam_y = render_pos[1] + player.rect.height // 2 - HEIGHT // 2
+
+        # Optimization: Only send network updates every N steps and when position changed
+        network_update_counter += steps
         if network_update_counter >= network_update_interval and network:
             # Only send if position actually changed
             if (abs(player.rect.x - last_player_x) > 1 or 
@@ -653,15 +1014,32 @@ def main(server_host="localhost", server_port=5555):
                 last_player_x = player.rect.x
                 last_player_y = player.rect.y
             network_update_counter = 0
-
-        screen.fill(WHITE)
-        draw_world(screen, cam_x, cam_y)
-        player.draw(screen, cam_x, cam_y, PLAYER_COLOR)
-        draw_other_players(screen, cam_x, cam_y, player)
-        draw_placement_preview(screen, cam_x, cam_y, player)
-        if debug:
-            draw_debug(screen, player, cam_x, cam_y, clock)
-        pygame.display.flip()
+        if network and time.perf_counter() >= next_ping:
+            next_ping = time.perf_counter() + PING_INTERVAL
+            network.send({"type": "ping", "time": time.perf_counter()})
+        profiler.mark("net")
+
+        def draw_overlays(surface):
+            rects = [player.draw(surface, cam_x, cam_y, PLAYER_COLOR, render_pos)]
+            rects += draw_other_players(surface, cam_x, cam_y, player)
+            rects.append(draw_placement_preview(surface, cam_x, cam_y, player))
+            profiler.mark("entities")
+            if show_minimap:
+                rects.append(minimap.draw(
+                    surface,
+                    (surface.get_width() - minimap.surface.get_width() - 10,
+                     surface.get_height() - minimap.surface.get_height() - 10),
+                    (player.rect.centerx // TILE_SIZE, player.rect.centery // TILE_SIZE),
+                ))
+            if debug:
+                rects += draw_debug(surface, player, cam_x, cam_y, clock)
+            profiler.mark("hud")
+            return [rect for rect in rects if rect]
+
+        changed = view.update(cam_x, cam_y)
+        profiler.mark("draw_world")
+        view.present(screen, changed, draw_overlays)
+        profiler.mark("flip")
 
     should_exit = True
     if network:
@@ -677,6 +1055,33 @@ if __name__ == "__main__":
                              "For local network: use server's IP address\n"
                              "Example: python 2dminecraft_multiplayer.py --host 192.168.1.100")
     parser.add_argument("--port", type=int, default=5555, help="Server port (default: 5555)")
+    parser.add_argument("--surface-memory", type=float, default=None, metavar="MB",
+                        help=f"Memory for pre-rendered chunk surfaces in MB "
+                             f"(default: {CHUNK_SURFACE_MEMORY // (1024 * 1024)})")
+    parser.add_argument("--world", default=None,
+                        help="With --headless: serve this saved world (e.g. a snapshot) locally and play on it")
+    parser.add_argument("--max-fps", type=int, default=MAX_FPS,
+                        help=f"Render frame rate cap, 0 for uncapped; physics always runs at {SIM_RATE} steps/s "
+                             f"(default: {MAX_FPS})")
+    parser.add_argument("--render-scale", type=float, default=RENDER_SCALE, metavar="SCALE",
+                        help="Draw the world at this fraction of the screen resolution and upscale it, "
+                             "e.g. 0.5 for a quarter of the pixels (default: 1)")
+    parser.add_argument("--dynamic-scale", action="store_true",
+                        help=f"Lower the render scale (down to {MIN_RENDER_SCALE}) while frames take longer than "
+                             f"1/{FPS}s, and raise it again up to --render-scale when they are fast")
+    add_headless_arguments(parser)
     args = parser.parse_args()
+    MAX_FPS = args.max_fps
+    if not 0 < args.render_scale <= 1:
+        parser.error("--render-scale must be greater than 0 and at most 1")
+    RENDER_SCALE = args.render_scale
+    DYNAMIC_SCALE = args.dynamic_scale
+    if args.surface_memory is not None:
+        CHUNK_SURFACE_MEMORY = int(args.surface_memory * 1024 * 1024)
+    if args.world:
+        if not headless_run:
+            parser.error("--world is only for --headless runs")
+        headless_run.start_server(args.world, args.port)
+        args.host = "127.0.0.1"
     
     main(server_host=args.host, server_port=args.port)
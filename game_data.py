@@ -1,7 +1,7 @@
 # =====================
 # GAME VERSION
 # =====================
-GAMEVERSION = "1.1.0"
+GAMEVERSION = "2.0.0"  # Bump on any protocol change: the server rejects clients whose version differs
 
 # =====================
 # BLOCK DEFINITIONS
@@ -236,3 +236,44 @@ ICE_TILE = 12
 DARK_OAK_WOOD_TILE = 13
 DARK_OAK_LEAF_TILE = 14
 CACTUS_TILE = 15
+
+# =====================
+# BLOCK REGISTRY
+# =====================
+class BlockRegistry:
+    """Block definitions compiled into lists indexed by block id.
+
+    Tiles are stored as byte ids, so every list has 256 entries and any tile
+    value can index them directly: registry.solid[tile_id] instead of
+    looking the id up by name in BLOCKS. Ids without a definition have no
+    name or color and, like before, count as solid.
+    """
+
+    SIZE = 256
+
+    def __init__(self, blocks):
+        self.keys = [None] * self.SIZE  # BLOCKS key ("dark_oak_wood")
+        self.names = [None] * self.SIZE  # Display name ("Dark Oak Wood")
+        self.colors = [None] * self.SIZE  # (r, g, b)
+        self.solid = [True] * self.SIZE
+        self.textures = [None] * self.SIZE  # Index into texture_names, or None
+        self.texture_names = []  # Distinct texture names, in id order
+        for key, block in sorted(blocks.items(), key=lambda item: item[1]["id"]):
+            block_id = block["id"]
+            self.keys[block_id] = key
+            self.names[block_id] = block["name"]
+            self.colors[block_id] = tuple(block["color"])
+            self.solid[block_id] = block["solid"]
+            texture = block.get("texture")
+            if texture:
+                if texture not in self.texture_names:
+                    self.texture_names.append(texture)
+                self.textures[block_id] = self.texture_names.index(texture)
+
+    def __contains__(self, block_id):
+        return type(block_id) is int and 0 <= block_id < self.SIZE and self.keys[block_id] is not None
+
+    def __len__(self):
+        return sum(key is not None for key in self.keys)
+
+BLOCK_REGISTRY = BlockRegistry(BLOCKS)
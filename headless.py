@@ -0,0 +1,212 @@
+import argparse
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import socket
+import subprocess
+import sys
+import time
+
+HEADLESS_RESOLUTION = "1920x1080"
+HEADLESS_FRAMES = 600
+# Scripted movement: comma-separated "keys:frames" steps, repeated until the run ends
+# (d = right, a = left, w = jump; no keys = stand still)
+DEFAULT_SCRIPT = "d:120,dw:15,d:90,:30,a:150,aw:15,a:90,:60"
+SERVER_START_TIMEOUT = 10.0
+
+def add_headless_arguments(parser):
+    group = parser.add_argument_group("headless benchmark")
+    group.add_argument("--headless", action="store_true",
+                       help="Run without a window (SDL dummy video driver) on scripted input and "
+                            "print frame-time percentiles on exit")
+    group.add_argument("--resolution", default=HEADLESS_RESOLUTION, metavar="WxH",
+                       help=f"Offscreen surface size in headless mode (default: {HEADLESS_RESOLUTION})")
+    group.add_argument("--frames", type=int, default=HEADLESS_FRAMES,
+                       help=f"Frames to run in headless mode (default: {HEADLESS_FRAMES})")
+    group.add_argument("--script", default=DEFAULT_SCRIPT,
+                       help=f"Scripted movement as keys:frames steps (default: {DEFAULT_SCRIPT})")
+    group.add_argument("--seed", type=int, default=0, help="Seed for the random module in headless mode")
+    group.add_argument("--profile", type=int, default=0, metavar="N",
+                       help="Also profile the run with cProfile and print the top N functions "
+                            "(frame times then include profiler overhead)")
+
+class _Keys:
+    """Stands in for pygame.key.get_pressed(): indexable by key constant"""
+
+    def __init__(self, held=()):
+        self.held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+class HeadlessRun:
+    """Runs a client's real main loop offscreen and reports how long its frames took.
+
+    Nothing in the game loop changes: set_mode() opens the display on SDL's
+    dummy driver and swaps in pygame functions the loop already calls.
+    pygame.event.get starts a frame (and posts QUIT when the run is over),
+    display.flip/update end it, get_pressed replays the movement script,
+    the mouse stays at the screen center and the clock is uncapped.
+    """
+
+    def __init__(self, resolution, frames, script, seed=0, profile=0):
+        self.resolution = resolution
+        self.frames = frames
+        self.steps = self._parse_script(script)
+        self.profile = profile
+        self.profiler = cProfile.Profile() if profile else None
+        self.frame_times = []
+        self.frame_start = None
+        self.started = None
+        self.server = None
+        self.keys = _Keys()
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        import random
+        random.seed(seed)
+
+    @classmethod
+    def from_argv(cls, argv=None):
+        """A HeadlessRun if --headless is on the command line, else None.
+
+        Call before pygame.init() so the dummy driver is picked up.
+        """
+        parser = argparse.ArgumentParser(add_help=False)
+        add_headless_arguments(parser)
+        args, _ = parser.parse_known_args(argv)
+        if not args.headless:
+            return None
+        try:
+            width, height = (int(n) for n in args.resolution.lower().split("x"))
+        except ValueError:
+            raise SystemExit(f"--resolution must look like 1920x1080, got {args.resolution!r}")
+        return cls((width, height), args.frames, args.script, args.seed, args.profile)
+
+    @staticmethod
+    def _parse_script(script):
+        import pygame
+        steps = []
+        for step in script.split(","):
+            keys, _, frames = step.strip().partition(":")
+            steps.append((frozenset(getattr(pygame, f"K_{k}") for k in keys), int(frames or 1)))
+        return steps
+
+    # =====================
+    # PYGAME HOOKS
+    # =====================
+    def set_mode(self):
+        """Open the offscreen display and take over the loop's input and timing"""
+        import pygame
+        screen = pygame.display.set_mode(self.resolution)
+        real_get, real_flip, real_update, real_clock = (
+            pygame.event.get, pygame.display.flip, pygame.display.update, pygame.time.Clock
+        )
+
+        def get(*args, **kwargs):
+            self._start_frame()
+            events = real_get(*args, **kwargs)
+            if len(self.frame_times) >= self.frames - 1:
+                events.append(pygame.event.Event(pygame.QUIT))
+            return events
+
+        def flip():
+            real_flip()
+            self._end_frame()
+
+        def update(*args):
+            real_update(*args)
+            self._end_frame()
+
+        class Clock:
+            """pygame Clock that never sleeps, so the run measures work rather than the frame cap"""
+
+            def __init__(self):
+                self.clock = real_clock()
+
+            def tick(self, framerate=0):
+                return self.clock.tick()
+
+            def __getattr__(self, name):
+                return getattr(self.clock, name)
+
+        pygame.event.get = get
+        pygame.display.flip = flip
+        pygame.display.update = update
+        pygame.time.Clock = Clock
+        pygame.key.get_pressed = lambda: self.keys
+        pygame.mouse.get_pos = lambda: (self.resolution[0] // 2, self.resolution[1] // 2)
+        atexit.register(self.report)
+        print(f"Headless run: {self.resolution[0]}x{self.resolution[1]}, {self.frames} frames")
+        return screen
+
+    def _start_frame(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+            if self.profiler:
+                self.profiler.enable()
+        frame = len(self.frame_times)
+        cycle = sum(frames for _, frames in self.steps)
+        offset = frame % cycle
+        for keys, frames in self.steps:
+            if offset < frames:
+                self.keys = _Keys(keys)
+                break
+            offset -= frames
+        self.frame_start = time.perf_counter()
+
+    def _end_frame(self):
+        if self.frame_start is not None:
+            self.frame_times.append(time.perf_counter() - self.frame_start)
+            self.frame_start = None
+
+    # =====================
+    # LOCAL SERVER
+    # =====================
+    def start_server(self, world, port):
+        """Serve a saved world (e.g. a snapshot) on localhost for the run; stopped at exit"""
+        server_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+        self.server = subprocess.Popen(
+            [sys.executable, server_py, "--world", world, "--port", str(port), "--stats-interval", "0"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        atexit.register(self.stop_server)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.server.poll() is not None:
+                raise SystemExit(f"Server for {world} exited with code {self.server.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise SystemExit(f"Server for {world} did not start within {SERVER_START_TIMEOUT:.0f}s")
+
+    def stop_server(self):
+        if self.server is not None and self.server.poll() is None:
+            self.server.terminate()
+            self.server.wait(timeout=10)
+
+    # =====================
+    # REPORT
+    # =====================
+    def report(self):
+        if self.profiler:
+            self.profiler.disable()
+        if not self.frame_times:
+            print("Headless run: no frames completed")
+            return
+        times = sorted(self.frame_times)
+
+        def percentile(p):
+            return times[min(len(times) - 1, len(times) * p // 100)] * 1000
+
+        elapsed = time.perf_counter() - self.started
+        print(f"Headless run: {len(times)} frames in {elapsed:.2f}s ({len(times) / elapsed:.0f} FPS uncapped)")
+        print(f"Frame time (ms): p50 {percentile(50):.2f}, p90 {percentile(90):.2f}, p99 {percentile(99):.2f}, "
+              f"max {times[-1] * 1000:.2f}, mean {sum(times) / len(times) * 1000:.2f}")
+        if self.profiler:
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats("tottime").print_stats(self.profile)
+            print(out.getvalue())
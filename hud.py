@@ -0,0 +1,145 @@
+import time
+from collections import OrderedDict, deque
+
+import pygame
+
+TEXT_CACHE_SIZE = 512  # Rendered strings kept before the least recently used is dropped
+HUD_UPDATE_INTERVAL = 0.2  # Seconds between rebuilds of a HUD panel's text
+PROFILE_FRAMES = 120  # Frames of per-phase timings kept for the performance overlay
+
+class TextCache:
+    """font.render results keyed by (text, color), evicted least recently used first.
+
+    Labels and HUD lines mostly repeat from frame to frame ("P3", "Biome:
+    Forest"), so rendering each distinct string once turns per-frame text
+    into a dict lookup and a blit.
+    """
+
+    def __init__(self, font, max_entries=TEXT_CACHE_SIZE):
+        self.font = font
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()  # {(text, color): Surface}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, color=(0, 0, 0)):
+        key = (text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+class HudPanel:
+    """A block of text lines kept on one surface and blitted as a whole.
+
+    draw() asks for the lines at most every interval seconds; in between it
+    blits the panel as last built. On a rebuild only the rows whose text
+    changed are cleared and redrawn.
+    """
+
+    def __init__(self, text_cache, line_height=18, interval=HUD_UPDATE_INTERVAL, color=(0, 0, 0)):
+        self.text_cache = text_cache
+        self.line_height = line_height
+        self.interval = interval
+        self.color = color
+        self.lines = []
+        self.surface = None
+        self.size = (0, 0)  # Part of surface in use
+        self.next_update = 0.0
+
+    def _rebuild(self, lines):
+        rendered = [self.text_cache.render(line, self.color) if line else None for line in lines]
+        width = max((text.get_width() for text in rendered if text), default=0)
+        height = len(lines) * self.line_height
+        if self.surface is None or width > self.surface.get_width() or height > self.surface.get_height():
+            # Grow with some slack so lines getting a little longer doesn't reallocate
+            self.surface = pygame.Surface((width + 64, height + self.line_height * 4), pygame.SRCALPHA)
+            self.lines = []
+        panel_width = self.surface.get_width()
+        for i, line in enumerate(lines):
+            if i < len(self.lines) and self.lines[i] == line:
+                continue
+            row = pygame.Rect(0, i * self.line_height, panel_width, self.line_height)
+            self.surface.fill((0, 0, 0, 0), row)
+            if rendered[i]:
+                self.surface.blit(rendered[i], row)
+        if len(self.lines) > len(lines):
+            self.surface.fill((0, 0, 0, 0), (0, height, panel_width, (len(self.lines) - len(lines)) * self.line_height))
+        self.lines = list(lines)
+        self.size = (width, height)
+
+    def draw(self, surface, pos, get_lines):
+        """Blit the panel at pos, calling get_lines() for fresh text if it is due; returns the rect drawn"""
+        now = time.perf_counter()
+        if now >= self.next_update:
+            self.next_update = now + self.interval
+            self._rebuild(get_lines())
+        if not self.lines:
+            return pygame.Rect(pos, (0, 0))
+        return surface.blit(self.surface, pos, pygame.Rect((0, 0), self.size))
+
+    def invalidate(self):
+        """Rebuild on the next draw (e.g. when the overlay is switched on)"""
+        self.next_update = 0.0
+
+class FrameProfiler:
+    """Rolling per-phase timings of the game loop.
+
+    Call start() at the top of a frame and mark(phase) after each phase;
+    a mark is one perf_counter() call and an append, so it can stay on all
+    the time. Averages are only computed when the overlay asks for them.
+    """
+
+    def __init__(self, phases, frames=PROFILE_FRAMES):
+        self.phases = list(phases)
+        self.samples = {phase: deque(maxlen=frames) for phase in self.phases}
+        self.frame_times = deque(maxlen=frames)  # Seconds of work per frame (sum of phases)
+        self.frame_start = None
+        self.last = None
+
+    def start(self):
+        if self.frame_start is not None:
+            self.frame_times.append(self.last - self.frame_start)
+        self.frame_start = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.samples[phase].append(now - self.last)
+        self.last = now
+
+    def averages(self):
+        """{phase: mean seconds} over the kept frames"""
+        return {phase: sum(s) / len(s) if s else 0.0 for phase, s in self.samples.items()}
+
+class FrameGraph:
+    """Bar graph of recent frame times, redrawn at most every interval seconds"""
+
+    def __init__(self, size, budget, interval=HUD_UPDATE_INTERVAL):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.budget = budget  # Seconds; drawn as a line at half height
+        self.interval = interval
+        self.next_update = 0.0
+
+    def draw(self, surface, pos, frame_times):
+        now = time.perf_counter()
+        if now >= self.next_update:
+            self.next_update = now + self.interval
+            self._redraw(frame_times)
+        return surface.blit(self.surface, pos)
+
+    def _redraw(self, frame_times):
+        width, height = self.surface.get_size()
+        self.surface.fill((0, 0, 0, 96))
+        scale = height / (2 * self.budget)
+        for x, frame_time in enumerate(list(frame_times)[-width:]):
+            bar = min(height, max(1, int(frame_time * scale)))
+            color = (80, 220, 80) if frame_time <= self.budget else (230, 70, 50)
+            self.surface.fill(color, (x, height - bar, 1, bar))
+        self.surface.fill((255, 255, 255), (0, height // 2, width, 1))
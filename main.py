@@ -2,15 +2,20 @@ import pygame
 import sys
 import random
 import math
+from headless import HeadlessRun
 #run with python c:/Users/felix/OneDrive/Desktop/2dwizardgame/2dminecraft.py
 
 # =====================
 # INITIAL SETUP
 # =====================
+headless_run = HeadlessRun.from_argv()  # --headless: offscreen, scripted input, frame-time report
 pygame.init()
 
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+if headless_run:
+    screen = headless_run.set_mode()
+else:
+    screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
 WIDTH, HEIGHT = screen.get_size()
 pygame.display.set_caption("wizard open world game")
 
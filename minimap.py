@@ -0,0 +1,133 @@
+import pygame
+
+from world_chunk import CHUNK_SIZE, CHUNK_AREA
+
+MINIMAP_RADIUS = 4  # Chunks shown on each side of the player's chunk
+MINIMAP_SCALE = 2  # Screen pixels per tile
+
+class Minimap:
+    """Overview of the chunks around the player, stitched from per-chunk thumbnails.
+
+    A thumbnail is a chunk's 256 block ids, one per pixel: the minimap is an
+    8-bit surface whose palette is the block colors, so making a thumbnail
+    is a to_raw() copy and patching one is a byte write. add() and patch()
+    only touch the thumbnails and are safe to call from the network thread.
+
+    update() re-composes the minimap surface only when the player enters
+    another chunk or a thumbnail in view changed; draw() is then one blit
+    of the cached, already scaled surface.
+    """
+
+    def __init__(self, colors, background=(255, 255, 255), radius=MINIMAP_RADIUS, scale=MINIMAP_SCALE):
+        """colors is 256 (r, g, b) or None (drawn as background) indexed by block id"""
+        self.radius = radius
+        self.scale = scale
+        self.span = (2 * radius + 1) * CHUNK_SIZE  # Tiles across
+        self.palette = [background if color is None else color for color in colors]
+        self.thumbnails = {}  # {(cx, cy): bytearray of 256 block ids, row-major}
+        self.pixels = bytearray(self.span * self.span)
+        self.center = None  # Chunk the surface was composed around
+        self.changed = True  # A thumbnail in view changed since then
+        self.surface = None
+
+    def add(self, key, chunk):
+        """(Re)make a chunk's thumbnail, on arrival or after a bulk edit"""
+        self.thumbnails[key] = chunk.to_raw()
+        self._touch(key)
+
+    def patch(self, tx, ty, block_id):
+        """Update one tile of a thumbnail after a block_change"""
+        key = (tx // CHUNK_SIZE, ty // CHUNK_SIZE)
+        thumbnail = self.thumbnails.get(key)
+        if thumbnail is not None:
+            thumbnail[(ty % CHUNK_SIZE) * CHUNK_SIZE + tx % CHUNK_SIZE] = block_id
+            self._touch(key)
+
+    def discard(self, key):
+        """Forget a chunk's thumbnail (the chunk was dropped from the client's cache)"""
+        self.thumbnails.pop(key, None)
+
+    def _touch(self, key):
+        center = self.center
+        if center is None or (abs(key[0] - center[0]) <= self.radius and abs(key[1] - center[1]) <= self.radius):
+            self.changed = True
+
+    def update(self, center):
+        """Re-compose around chunk center if the player moved to it or a thumbnail in view changed"""
+        if center == self.center and not self.changed:
+            return
+        self.center = center
+        self.changed = False  # Before reading, so edits arriving meanwhile trigger another pass
+        span = self.span
+        pixels = self.pixels
+        start_cx, start_cy = center[0] - self.radius, center[1] - self.radius
+        chunks = 2 * self.radius + 1
+        empty = bytes(CHUNK_AREA)
+        for j in range(chunks):
+            for i in range(chunks):
+                thumbnail = self.thumbnails.get((start_cx + i, start_cy + j)) or empty
+                offset = j * CHUNK_SIZE * span + i * CHUNK_SIZE
+                for row in range(0, CHUNK_AREA, CHUNK_SIZE):
+                    pixels[offset:offset + CHUNK_SIZE] = thumbnail[row:row + CHUNK_SIZE]
+                    offset += span
+        image = pygame.image.frombuffer(pixels, (span, span), "P")
+        image.set_palette(self.palette)
+        self.surface = pygame.transform.scale(image, (span * self.scale, span * self.scale))
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+
+    def draw(self, surface, pos, tile):
+        """Blit the minimap at pos with a marker at world tile (x, y); returns the rect drawn"""
+        if self.surface is None:
+            return pygame.Rect(pos, (0, 0))
+        rect = surface.blit(self.surface, pos)
+        origin_x = (self.center[0] - self.radius) * CHUNK_SIZE
+        origin_y = (self.center[1] - self.radius) * CHUNK_SIZE
+        marker = pygame.Rect(0, 0, self.scale * 3, self.scale * 3)
+        marker.center = (rect.x + (tile[0] - origin_x) * self.scale, rect.y + (tile[1] - origin_y) * self.scale)
+        surface.fill((255, 0, 0), marker.clip(rect))
+        pygame.draw.rect(surface, (0, 0, 0), rect, 1)
+        return rect
+
+
+if __name__ == "__main__":
+    # Minimap cost benchmark: python minimap.py
+    import os
+    import time
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((1920, 1080))
+
+    from game_data import BLOCK_REGISTRY
+    from world_gen import generate_chunk
+
+    minimap = Minimap(BLOCK_REGISTRY.colors)
+    chunks = {(cx, cy): generate_chunk(cx, cy, seed=1) for cx in range(-24, 24) for cy in range(-4, 10)}
+
+    start = time.perf_counter()
+    for key, chunk in chunks.items():
+        minimap.add(key, chunk)
+    print(f"Thumbnails: {(time.perf_counter() - start) / len(chunks) * 1e6:.1f} us/chunk")
+
+    start = time.perf_counter()
+    for i in range(40):
+        minimap.update((i - 20, 2))
+    print(f"Re-compose on entering a chunk: {(time.perf_counter() - start) / 40 * 1000:.3f} ms")
+
+    frames = 1000
+    start = time.perf_counter()
+    for i in range(frames):
+        minimap.update((0, 2))
+        minimap.draw(screen, (10, 10), (i % 16, 40))
+    frame = (time.perf_counter() - start) / frames * 1000
+    print(f"Per frame (no chunk change): {frame:.3f} ms")
+
+    start = time.perf_counter()
+    for i in range(frames):
+        minimap.patch(i % 16, 40, i % 7)
+        minimap.update((0, 2))
+        minimap.draw(screen, (10, 10), (i % 16, 40))
+    print(f"Per frame with an edit in view every frame: {(time.perf_counter() - start) / frames * 1000:.3f} ms")
+    if frame >= 1.0:
+        raise SystemExit("minimap costs 1 ms or more per frame")
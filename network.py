@@ -9,6 +9,11 @@ class Network:
         self.server = None
         self.addr = None
         self.player_id = None
+        # Traffic counters (bytes include the 4-byte length prefix)
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.messages_received = 0
+        self.bytes_received = 0
 
     def connect(self, host="localhost", port=5555):
         """Connect to the server"""
@@ -28,6 +33,8 @@ class Network:
             serialized = pickle.dumps(data)
             # Send length prefix (4 bytes) followed by data
             self.client.sendall(struct.pack("I", len(serialized)) + serialized)
+            self.messages_sent += 1
+            self.bytes_sent += 4 + len(serialized)
         except socket.error as e:
             print(f"Send error: {e}")
             return False
@@ -54,6 +61,9 @@ class Network:
                     return None
                 message_data += chunk
             
+            self.messages_received += 1
+            self.bytes_received += 4 + message_length
+
             # Unpickle and return
             obj = pickle.loads(message_data)
             return obj
@@ -96,6 +106,14 @@ class Network:
         """Set socket to non-blocking with timeout"""
         self.client.settimeout(0.1)
 
+    def stats(self):
+        return {
+            "messages_sent": self.messages_sent,
+            "bytes_sent": self.bytes_sent,
+            "messages_received": self.messages_received,
+            "bytes_received": self.bytes_received
+        }
+
     def disconnect(self):
         """Disconnect from server"""
         try:
@@ -1,236 +1,61 @@
 import socket
 import threading
 import pickle
-import random
-import math
 import argparse
 import struct
 import sys
 import os
 import time
+import signal
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 # Add current directory to path to ensure imports work
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from game_data import BLOCKS, ITEMS, AIR, DIRT_TILE, STONE_TILE, GRASS_TILE, SAND_TILE, WOOD_TILE, LEAF_TILE, GRAVEL_TILE, COAL_ORE_TILE, COPPER_ORE_TILE, OBSIDIAN_TILE, SNOW_TILE, ICE_TILE, DARK_OAK_WOOD_TILE, DARK_OAK_LEAF_TILE, CACTUS_TILE, GAMEVERSION
+from game_data import BLOCKS, ITEMS, GAMEVERSION, BLOCK_REGISTRY
+from world_gen import generate_chunk_column, ignore_interrupts
+from world import World, load_world_meta, MAX_CACHED_CHUNKS, CHUNK_BYTES, DEFAULT_GEN_WORKERS, DEFAULT_SAVE_INTERVAL
+from world_storage import WorldStorage
 
 # =====================
 # CONSTANTS
 # =====================
 TILE_SIZE = 40
 CHUNK_SIZE = 16
+DEFAULT_WORLD_DIR = "world"
+# Admin commands read from the server's stdin
+CONSOLE_COMMANDS = ("snapshot [path]", "stats", "fill X0 Y0 X1 Y1 BLOCK", "replace X0 Y0 X1 Y1 FROM TO")
+# Chunk area pregenerated by default (inclusive): the spawn region around chunk (0, 0)
+DEFAULT_PREGEN_AREA = (-16, -2, 16, 4)
 
-# =====================
-# WORLD GENERATION
-# =====================
-world = {}
-
-def hash_function(x):
-    """True random hash without sine - uses bit manipulation"""
-    x = int(x)
-    x = (x ^ 61) ^ (x >> 13)
-    x = x * 2654435769
-    x = x ^ (x >> 16)
-    return (x & 0x7fffffff) / 2147483647.0
-
-def linear_interpolate(t):
-    """Linear interpolation - less smooth, more jagged"""
-    return t
-
-def value_noise(x, scale=1.0):
-    """Generate value noise with less smoothing for more randomness"""
-    x_scaled = x / scale
-    xi = math.floor(x_scaled)
-    xf = x_scaled - xi
-    
-    # Hash based noise values
-    n0 = hash_function(xi)
-    n1 = hash_function(xi + 1)
-    
-    # Less smooth interpolation for more randomness
-    u = linear_interpolate(xf)
-    return n0 * (1 - u) + n1 * u
-
-def fractal_noise(x, octaves=6, persistence=0.5, scale=50):
-    """Generate fractal brownian motion for bumpy, random terrain"""
-    total = 0
-    amplitude = 1.0
-    frequency = 1.0
-    max_amplitude = 0
-    
-    for i in range(octaves):
-        # Add offset to each octave for more randomness
-        offset = i * 10000
-        total += value_noise(x * frequency + offset, scale / frequency) * amplitude
-        max_amplitude += amplitude
-        amplitude *= persistence
-        frequency *= 2.0
-    
-    return (total / max_amplitude) if max_amplitude > 0 else 0
-# !!!!!!! really important the below needs to be fixed so that the biome actually changes
-def get_biome(global_x):
-    """Determine biome type with smooth transitions"""
-    # Large scale noise for biome regions - less interpolation for more variation
-    biome_noise = value_noise(global_x, 300) * 100
-    biome_noise += value_noise(global_x + 5000, 150) * 50
-    
-    # Determine biome with smooth ranges
-    if biome_noise > 110:
-        return "desert"
-    elif biome_noise > 70:
-        return "plains"
-    elif biome_noise > 30:
-        return "forest"
-    elif biome_noise > -10:
-        return "mountain"
-    else:
-        return "ice_plains"
-
-def get_height(global_x):
-    """Get terrain height with heavy randomness and bumps"""
-    biome = get_biome(global_x)
-    
-    # Use fractal noise for bumpy, chaotic terrain
-    fractal = fractal_noise(global_x, octaves=5, persistence=0.6, scale=30)
-    
-    if biome == "mountain":
-        # Mountains: very bumpy and chaotic
-        return int(13 + fractal * 12)
-    elif biome == "desert":
-        # Desert: mostly flat with occasional bumps
-        return int(9 + fractal * 1.5)
-    elif biome == "ice_plains":
-        # Ice: very flat but with small random bumps
-        return int(10 + fractal * 0.8)
-    elif biome == "plains":
-        # Plains: gently rolling with randomness
-        return int(9 + fractal * 3)
-    else:
-        # Forest: moderately bumpy
-        return int(9 + fractal * 5)
-
-def generate_tree(tiles, x, y, biome="forest"):
-    """Generate a tree based on biome"""
-    if biome == "forest":
-        # Normal oak tree
-        height = random.randint(4, 6)
-        for i in range(height):
-            if y - i >= 0:
-                tiles[y - i][x] = WOOD_TILE
-        
-        leaf_start = y - height
-        for lx in range(-2, 3):
-            for ly in range(-2, 3):
-                if abs(lx) + abs(ly) < 4:
-                    tx = x + lx
-                    ty = leaf_start + ly
-                    if 0 <= tx < CHUNK_SIZE and 0 <= ty < CHUNK_SIZE:
-                        if tiles[ty][tx] == AIR:
-                            tiles[ty][tx] = LEAF_TILE
-    
-    elif biome == "mountain":
-        # Tall dark oak tree
-        height = random.randint(6, 9)
-        for i in range(height):
-            if y - i >= 0:
-                tiles[y - i][x] = DARK_OAK_WOOD_TILE
-        
-        leaf_start = y - height
-        for lx in range(-2, 3):
-            for ly in range(-3, 3):
-                if abs(lx) + abs(ly) < 5:
-                    tx = x + lx
-                    ty = leaf_start + ly
-                    if 0 <= tx < CHUNK_SIZE and 0 <= ty < CHUNK_SIZE:
-                        if tiles[ty][tx] == AIR:
-                            tiles[ty][tx] = DARK_OAK_LEAF_TILE
-    
-    elif biome == "desert":
-        # Cactus instead of trees
-        height = random.randint(2, 4)
-        for i in range(height):
-            if y - i >= 0:
-                tiles[y - i][x] = CACTUS_TILE
-
-def generate_chunk(cx, cy):
-    """Generate a chunk with biome-specific features"""
-    tiles = [[AIR for _ in range(CHUNK_SIZE)] for _ in range(CHUNK_SIZE)]
-    
-    for y in range(CHUNK_SIZE):
-        for x in range(CHUNK_SIZE):
-            global_x = cx * CHUNK_SIZE + x
-            global_y = cy * CHUNK_SIZE + y
-            ground_height = get_height(global_x)
-            biome = get_biome(global_x)
-            
-            if global_y > ground_height:
-                # Surface block
-                if global_y == ground_height + 1:
-                    if biome == "desert":
-                        tiles[y][x] = SAND_TILE
-                    elif biome == "ice_plains":
-                        tiles[y][x] = SNOW_TILE if random.random() < 0.8 else ICE_TILE
-                    elif biome == "mountain":
-                        tiles[y][x] = STONE_TILE if random.random() < 0.6 else GRAVEL_TILE
-                    else:  # plains and forest
-                        tiles[y][x] = GRASS_TILE
-                
-                # Underground blocks
-                elif global_y > ground_height + 4:
-                    if biome == "desert":
-                        tiles[y][x] = SAND_TILE if random.random() < 0.7 else GRAVEL_TILE
-                    elif biome == "ice_plains":
-                        tiles[y][x] = ICE_TILE
-                    else:
-                        # Stone with ores
-                        if random.random() < 0.05:
-                            tiles[y][x] = COAL_ORE_TILE
-                        elif random.random() < 0.02:
-                            tiles[y][x] = COPPER_ORE_TILE
-                        elif random.random() < 0.01 and global_y > ground_height + 10:
-                            tiles[y][x] = OBSIDIAN_TILE
-                        else:
-                            tiles[y][x] = STONE_TILE if random.random() < 0.8 else DIRT_TILE
-                else:
-                    tiles[y][x] = DIRT_TILE
-
-    # Add trees and vegetation
-    for x in range(CHUNK_SIZE):
-        global_x = cx * CHUNK_SIZE + x
-        ground_y = get_height(global_x)
-        local_y = ground_y - cy * CHUNK_SIZE
-        biome = get_biome(global_x)
-        
-        if 0 <= local_y < CHUNK_SIZE:
-            # Forest biome has more trees
-            if biome == "forest" and random.random() < 0.06:
-                generate_tree(tiles, x, local_y, biome)
-            # Mountain biome has some trees
-            elif biome == "mountain" and random.random() < 0.03:
-                generate_tree(tiles, x, local_y, biome)
-            # Desert has cacti
-            elif biome == "desert" and random.random() < 0.05:
-                generate_tree(tiles, x, local_y, biome)
-
-    return tiles
-
-def get_chunk(cx, cy):
-    if (cx, cy) not in world:
-        world[(cx, cy)] = generate_chunk(cx, cy)
-    return world[(cx, cy)]
+def pack_changes(edits):
+    """Encode [(lx, ly, block_type), ...] for one chunk as (tile index, block id) byte pairs"""
+    return bytes(value for lx, ly, block_type in edits for value in (ly * CHUNK_SIZE + lx, block_type))
 
 # =====================
 # SERVER CLASS
 # =====================
 class GameServer:
-    def __init__(self, host="localhost", port=5555):
+    def __init__(self, host="localhost", port=5555, stats_interval=60, seed=None,
+                 max_cached_chunks=MAX_CACHED_CHUNKS, gen_workers=DEFAULT_GEN_WORKERS,
+                 world_dir=DEFAULT_WORLD_DIR, save_interval=DEFAULT_SAVE_INTERVAL):
         self.host = host
         self.port = port
+        self.stats_interval = stats_interval
+        self.world = World(seed=seed, max_cached_chunks=max_cached_chunks, gen_workers=gen_workers,
+                           storage=WorldStorage(world_dir), save_interval=save_interval)
         self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.clients = {}
         self.player_id_counter = 0
         self.lock = threading.Lock()
+        # One lock per connected client socket - chunks are sent from the
+        # client's sender thread while its own thread and broadcasts also send.
+        # A socket without one has disconnected and is not sent to.
+        self.send_locks = {}
         # Optimization: Throttle broadcast frequency
         self.last_broadcast_time = 0
         self.broadcast_interval = 0.05  # Broadcast every 50ms instead of every message
@@ -260,6 +85,7 @@ class GameServer:
             print("MULTIPLAYER WIZARD GAME - SERVER")
             print("=" * 50)
             print(f"Server started on {self.host}:{self.port}")
+            print(f"World: {self.world.storage.path} (seed {self.world.seed})")
             
             # Show the IP address clients should use
             local_ip = self.get_local_ip()
@@ -267,11 +93,22 @@ class GameServer:
             print(f"   IPv4 Address: {local_ip}:{self.port}")
             print(f"\n   Command:")
             print(f"   python 2dminecraft_multiplayer.py --host {local_ip}")
+            print(f"\n   Console commands: {', '.join(CONSOLE_COMMANDS)}")
             print("=" * 50 + "\n")
             
+            if self.stats_interval > 0:
+                stats_thread = threading.Thread(target=self.stats_loop)
+                stats_thread.daemon = True
+                stats_thread.start()
+            
+            console_thread = threading.Thread(target=self.console_loop)
+            console_thread.daemon = True
+            console_thread.start()
+            
             while True:
                 client, addr = self.server.accept()
                 print(f"Connection from {addr}")
+                self.send_locks[client] = threading.Lock()
                 
                 with self.lock:
                     player_id = self.player_id_counter
@@ -291,7 +128,7 @@ class GameServer:
                             "type": "connection_rejected",
                             "reason": "Invalid protocol"
                         })
-                        client.close()
+                        self.close_client(client)
                         continue
                     
                     client_version = version_check.get("version")
@@ -301,13 +138,13 @@ class GameServer:
                             "type": "connection_rejected",
                             "reason": f"Version mismatch. Server: {GAMEVERSION}, Your version: {client_version}"
                         })
-                        client.close()
+                        self.close_client(client)
                         continue
                     
                     print(f"  ✓ Version check passed ({GAMEVERSION})")
                 except Exception as e:
                     print(f"  ❌ Error during version check: {e}")
-                    client.close()
+                    self.close_client(client)
                     continue
                 
                 # Send version check acknowledgment
@@ -347,9 +184,91 @@ class GameServer:
             print(f"Server error: {e}")
         finally:
             self.server.close()
+            self.world.close()
+
+    def stats_loop(self):
+        """Periodically print world/cache statistics"""
+        while True:
+            time.sleep(self.stats_interval)
+            self.print_stats()
+
+    def print_stats(self):
+        """Print world/cache statistics"""
+        world_stats = self.world.stats()
+        cache = world_stats["column_cache"]
+        print(f"[stats] players: {len(self.clients)}, chunks in memory: "
+              f"{world_stats['cached_chunks']}/{world_stats['max_cached_chunks']} "
+              f"({world_stats['pinned_chunks']} near players), evicting {world_stats['eviction_rate']:.1f}/s, "
+              f"edited chunks: {world_stats['edited_chunks']} ({world_stats['edited_blocks']} blocks)")
+        print(f"[stats] chunk generation: {world_stats['generated']} generated, {world_stats['loaded']} loaded from disk, "
+              f"{world_stats['pending']} in flight, {world_stats['deduplicated']} duplicate requests merged")
+        print(f"[stats] storage: {world_stats['unsaved_chunks']} unsaved chunks, {world_stats['saved']} saved, "
+              f"last save took {world_stats['last_save_time'] * 1000:.1f}ms")
+        print(f"[stats] edit log: {world_stats['logged_edits']} edits in {world_stats['log_commits']} commits, "
+              f"tick {world_stats['tick']}")
+        if cache["in_workers"]:
+            # Spans and evictions are per worker process; only hits and misses come back
+            print(f"[stats] column cache (generation workers): hit rate {cache['hit_rate'] * 100:.1f}% "
+                  f"({cache['hits']} hits, {cache['misses']} misses)")
+        else:
+            print(f"[stats] column cache: hit rate {cache['hit_rate'] * 100:.1f}% "
+                  f"({cache['hits']} hits, {cache['misses']} misses), "
+                  f"{cache['spans']}/{cache['max_spans']} spans, {cache['evictions']} evictions")
+
+    def console_loop(self):
+        """Admin commands typed into the server terminal"""
+        for line in sys.stdin:
+            command = line.split()
+            if not command:
+                continue
+            if command[0] == "snapshot":
+                # Runs in the background; the server keeps serving meanwhile
+                path = command[1] if len(command) > 1 else None
+                threading.Thread(target=self.take_snapshot, args=(path,), daemon=True).start()
+            elif command[0] == "stats":
+                self.print_stats()
+            elif command[0] in ("fill", "replace") and len(command) == (6 if command[0] == "fill" else 7):
+                try:
+                    args = [int(a) for a in command[1:]]
+                except ValueError:
+                    print("Coordinates and block ids must be integers")
+                    continue
+                if command[0] == "fill":
+                    request = {"type": "fill_region", "block_type": args[4]}
+                else:
+                    request = {"type": "replace_region", "from_block": args[4], "to_block": args[5]}
+                request.update(x0=args[0], y0=args[1], x1=args[2], y1=args[3])
+                changes = self.bulk_edit(request)
+                print(f"{command[0]}: {sum(len(e) for _, e in changes.values())} blocks changed in {len(changes)} chunks")
+            else:
+                print(f"Commands: {', '.join(CONSOLE_COMMANDS)}")
+
+    def take_snapshot(self, path=None):
+        """Copy the running world to path (default: <world>-snapshot-<time>) and report the cost"""
+        if path is None:
+            path = f"{self.world.storage.path}-snapshot-{time.strftime('%Y%m%d-%H%M%S')}"
+        print(f"[snapshot] writing {path} ...")
+        try:
+            result = self.world.snapshot(path)
+        except Exception as e:
+            print(f"[snapshot] failed: {e}")
+            return
+
+        def ms(seconds):
+            return f"{seconds * 1000:.2f}ms" if seconds is not None else "-"
+        print(f"[snapshot] {result['chunks']} chunks ({result['bytes'] / 1024:.0f} KB) in {ms(result['duration'])}, "
+              f"edits paused {ms(result['capture_time'])} for the capture")
+        print(f"[snapshot] place_block latency p50/p99: {ms(result['edit_p50_before'])}/{ms(result['edit_p99_before'])} "
+              f"before, {ms(result['edit_p50_during'])}/{ms(result['edit_p99_during'])} during "
+              f"({result['edits_during']} edits)")
 
     def handle_client(self, client, addr, player_id):
         """Handle individual client connection"""
+        # Generated chunks are sent from the client's own sender thread, so a slow
+        # client holds up only its own chunks
+        chunk_queue = queue.Queue()
+        sender = threading.Thread(target=self.chunk_sender, args=(client, chunk_queue), daemon=True)
+        sender.start()
         try:
             while True:
                 data = self.receive_from_client(client)
@@ -368,6 +287,9 @@ class GameServer:
                             self.clients[player_id]["vel_x"] = data["vel_x"]
                             self.clients[player_id]["vel_y"] = data["vel_y"]
                             self.clients[player_id]["on_ground"] = data["on_ground"]
+                    # Keep the chunks around the player resident (positions are in pixels)
+                    self.world.update_player(player_id, int(data["x"]) // (TILE_SIZE * CHUNK_SIZE),
+                                             int(data["y"]) // (TILE_SIZE * CHUNK_SIZE))
                     
                     # Broadcast all players to all clients
                     self.broadcast_players()
@@ -376,20 +298,31 @@ class GameServer:
                     # Update world
                     tx, ty = data["x"], data["y"]
                     block_type = data["block_type"]
-                    self.place_block(tx, ty, block_type)
+                    if block_type not in BLOCK_REGISTRY:
+                        print(f"Rejected place_block: unknown block id {block_type!r}")
+                        continue
+                    version = self.place_block(tx, ty, block_type)
                     # Broadcast block change
-                    self.broadcast_block_change(tx, ty, block_type)
+                    self.broadcast_block_change(tx, ty, block_type, version)
+                
+                elif msg_type == "ping":
+                    # Echoed back so the client can measure round-trip time
+                    self.send_to_client(client, {"type": "pong", "time": data["time"]})
+                
+                elif msg_type in ("fill_region", "replace_region", "place_blocks"):
+                    # Bulk edits: applied chunk-at-a-time, one block_changes message per chunk
+                    self.bulk_edit(data)
                 
                 elif msg_type == "get_chunk":
-                    # Send chunk data
                     cx, cy = data["cx"], data["cy"]
-                    chunk = get_chunk(cx, cy)
-                    self.send_to_client(client, {
-                        "type": "chunk_data",
-                        "cx": cx,
-                        "cy": cy,
-                        "data": chunk
-                    })
+                    if "version" in data:
+                        # Client still has an old copy: send only what changed if the journal allows
+                        delta = self.world.chunk_delta(cx, cy, data["version"])
+                        if delta is not None:
+                            self.send_chunk_delta(client, cx, cy, *delta)
+                            continue
+                    # Send chunk data once it's loaded/generated
+                    self.world.request_chunk(cx, cy, lambda chunk, cx=cx, cy=cy: chunk_queue.put((cx, cy, chunk)))
         
         except Exception as e:
             print(f"Client {player_id} error: {e}")
@@ -397,9 +330,20 @@ class GameServer:
             with self.lock:
                 if player_id in self.clients:
                     del self.clients[player_id]
+            self.world.remove_player(player_id)
+            # Without its send lock the sender skips the chunks still queued;
+            # joining it waits out a send in progress before the socket closes
+            self.send_locks.pop(client, None)
+            chunk_queue.put(None)
+            sender.join()
             client.close()
             print(f"Client {player_id} disconnected")
 
+    def close_client(self, client):
+        """Stop sending to a client socket and close it"""
+        self.send_locks.pop(client, None)
+        client.close()
+
     def receive_from_client(self, client):
         """Receive data from a client with length prefix"""
         try:
@@ -428,15 +372,50 @@ class GameServer:
 
     def send_to_client(self, client, data):
         """Send data to a client with length prefix"""
+        send_lock = self.send_locks.get(client)
+        if send_lock is None:
+            return False  # Disconnected
         try:
             serialized = pickle.dumps(data)
             # Send length prefix (4 bytes) followed by data
-            client.sendall(struct.pack("I", len(serialized)) + serialized)
+            with send_lock:
+                client.sendall(struct.pack("I", len(serialized)) + serialized)
         except Exception as e:
             print(f"Send error: {e}")
             return False
         return True
 
+    def chunk_sender(self, client, chunk_queue):
+        """Send the chunks queued for one client until None is queued"""
+        while True:
+            job = chunk_queue.get()
+            if job is None:
+                return
+            self.send_chunk(client, *job)
+
+    def send_chunk(self, client, cx, cy, chunk):
+        """Send a chunk to a client (palette-encoded, see Chunk.to_bytes)"""
+        self.send_to_client(client, {
+            "type": "chunk_data",
+            "cx": cx,
+            "cy": cy,
+            "version": chunk.version,
+            "data": chunk.to_bytes()
+        })
+
+    def send_chunk_delta(self, client, cx, cy, version, edits):
+        """Update a client's old copy of a chunk: chunk_up_to_date, or chunk_delta with the edits since"""
+        if not edits:
+            self.send_to_client(client, {"type": "chunk_up_to_date", "cx": cx, "cy": cy, "version": version})
+            return
+        self.send_to_client(client, {
+            "type": "chunk_delta",
+            "cx": cx,
+            "cy": cy,
+            "version": version,
+            "changes": pack_changes(edits)
+        })
+
     def broadcast_players(self):
         """Broadcast all player data to all clients (throttled)"""
         current_time = time.time()
@@ -463,35 +442,158 @@ class GameServer:
                 "players": players_data
             })
 
-    def broadcast_block_change(self, tx, ty, block_type):
+    def broadcast_block_change(self, tx, ty, block_type, version):
         """Broadcast block change to all clients"""
         for pid, player_info in self.clients.items():
             self.send_to_client(player_info["socket"], {
                 "type": "block_change",
                 "x": tx,
                 "y": ty,
-                "block_type": block_type
+                "block_type": block_type,
+                "version": version
             })
 
+    def broadcast_block_changes(self, changes):
+        """Broadcast bulk edits (as returned by World.place_blocks) as one block_changes message per chunk"""
+        clients = [player_info["socket"] for player_info in list(self.clients.values())]
+        for (cx, cy), (version, edits) in changes.items():
+            message = {
+                "type": "block_changes",
+                "cx": cx,
+                "cy": cy,
+                "version": version,
+                "changes": pack_changes(
+                    (tile_x % CHUNK_SIZE, tile_y % CHUNK_SIZE, block_type) for tile_x, tile_y, block_type in edits
+                )
+            }
+            for client in clients:
+                self.send_to_client(client, message)
+
     def place_block(self, tile_x, tile_y, block_type):
-        """Place a block in the world"""
-        cx = tile_x // CHUNK_SIZE
-        cy = tile_y // CHUNK_SIZE
+        """Place a block in the world; returns the chunk's new version"""
+        return self.world.place_block(tile_x, tile_y, block_type)
 
-        chunk = get_chunk(cx, cy)
+    def bulk_edit(self, data):
+        """Apply a fill_region / replace_region / place_blocks request and broadcast the result"""
+        msg_type = data["type"]
+        try:
+            if msg_type == "fill_region":
+                new_blocks = [data["block_type"]]
+            elif msg_type == "replace_region":
+                new_blocks = [data["to_block"]]
+            else:
+                new_blocks = {edit[2] for edit in data["edits"]}
+            for block_type in new_blocks:
+                if block_type not in BLOCK_REGISTRY:
+                    raise ValueError(f"unknown block id {block_type!r}")
+            if msg_type == "fill_region":
+                changes = self.world.fill(data["x0"], data["y0"], data["x1"], data["y1"], data["block_type"])
+            elif msg_type == "replace_region":
+                changes = self.world.replace(data["x0"], data["y0"], data["x1"], data["y1"],
+                                             data["from_block"], data["to_block"])
+            else:
+                changes = self.world.place_blocks(data["edits"])
+        except ValueError as e:
+            print(f"Rejected {msg_type}: {e}")
+            return {}
+        self.broadcast_block_changes(changes)
+        return changes
 
-        lx = tile_x % CHUNK_SIZE
-        ly = tile_y % CHUNK_SIZE
+# =====================
+# PREGENERATION
+# =====================
+def pregenerate(storage, seed, area, workers):
+    """Generate every chunk in area (x0, y0, x1, y1 inclusive) into storage.
 
-        if 0 <= lx < CHUNK_SIZE and 0 <= ly < CHUNK_SIZE:
-            chunk[ly][lx] = block_type
+    Chunks already in storage are skipped, so an interrupted run can simply be
+    started again. Work is split by chunk column so each worker process reuses
+    its column cache for the whole vertical stack.
+    """
+    x0, y0, x1, y1 = area
+    saved = storage.saved_chunks()
+    columns = []
+    for cx in range(x0, x1 + 1):
+        missing = [cy for cy in range(y0, y1 + 1) if (cx, cy) not in saved]
+        if missing:
+            columns.append((cx, missing))
+
+    total = (x1 - x0 + 1) * (y1 - y0 + 1)
+    todo = sum(len(cys) for _, cys in columns)
+    print(f"Pregenerating chunks x {x0}..{x1}, y {y0}..{y1} (seed {seed}) with {workers} workers")
+    print(f"  {total} chunks in area, {total - todo} already saved, {todo} to generate")
+    if todo == 0:
+        return
+
+    done = 0
+    start = time.time()
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=ignore_interrupts)
+    try:
+        futures = {
+            pool.submit(generate_chunk_column, cx, cys, seed): (cx, cys)
+            for cx, cys in columns
+        }
+        for future in as_completed(futures):
+            cx, cys = futures[future]
+            storage.save_chunks([((cx, cy), chunk.to_bytes()) for cy, chunk in zip(cys, future.result())])
+            done += len(cys)
+            rate = done / max(time.time() - start, 1e-9)
+            print(f"\r  {done}/{todo} chunks ({done * 100 / todo:.1f}%), {rate:.0f} chunks/s", end="", flush=True)
+    except (KeyboardInterrupt, BrokenProcessPool):
+        # Workers ignore Ctrl-C, but a worker killed some other way breaks the pool
+        print(f"\nInterrupted after {done} chunks - run pregen again to resume")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return
+    pool.shutdown()
+
+    elapsed = time.time() - start
+    rate = done / max(elapsed, 1e-9)
+    print(f"\nGenerated {done} chunks in {elapsed:.1f}s: "
+          f"{rate:.0f} chunks/s, {rate / workers:.0f} chunks/s per core")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Game Server")
+    parser.add_argument("mode", nargs="?", default="serve", choices=["serve", "pregen"],
+                        help="serve: run the game server (default). pregen: generate chunks into the world and exit")
     parser.add_argument("--host", default="0.0.0.0", help="Server host/IP (default: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=5555, help="Server port (default: 5555)")
+    parser.add_argument("--stats-interval", type=float, default=60,
+                        help="Seconds between stats printouts, 0 to disable (default: 60)")
+    parser.add_argument("--seed", type=int, default=None, help="World seed (default: random)")
+    parser.add_argument("--chunk-cache", type=int, default=MAX_CACHED_CHUNKS,
+                        help=f"Max generated chunks kept in memory (default: {MAX_CACHED_CHUNKS})")
+    parser.add_argument("--chunk-memory", type=float, default=None, metavar="MB",
+                        help=f"Memory budget for cached chunks in MB, instead of --chunk-cache "
+                             f"(about {CHUNK_BYTES} bytes per chunk)")
+    parser.add_argument("--gen-workers", type=int, default=None,
+                        help=f"Chunk generation processes, 0 to generate on client threads "
+                             f"(default: {DEFAULT_GEN_WORKERS}, or all cores for pregen)")
+    parser.add_argument("--world", default=DEFAULT_WORLD_DIR, help=f"World directory (default: {DEFAULT_WORLD_DIR})")
+    parser.add_argument("--save-interval", type=float, default=DEFAULT_SAVE_INTERVAL,
+                        help=f"Seconds between saves of changed chunks (default: {DEFAULT_SAVE_INTERVAL})")
+    parser.add_argument("--area", type=int, nargs=4, default=DEFAULT_PREGEN_AREA, metavar=("X0", "Y0", "X1", "Y1"),
+                        help="Chunk range to pregenerate, inclusive (default: %(default)s)")
     args = parser.parse_args()
     
-    server = GameServer(host=args.host, port=args.port)
+    if args.mode == "pregen":
+        # Only the seed and the region files are needed: no World (and no edit log) for this
+        storage = WorldStorage(args.world)
+        workers = args.gen_workers if args.gen_workers else (os.cpu_count() or 1)
+        try:
+            pregenerate(storage, load_world_meta(storage, args.seed)["seed"], args.area, workers)
+        finally:
+            storage.close()
+        sys.exit(0)
+    
+    if args.gen_workers is None:
+        args.gen_workers = DEFAULT_GEN_WORKERS
+    if args.chunk_memory is not None:
+        args.chunk_cache = max(1, int(args.chunk_memory * 1024 * 1024) // CHUNK_BYTES)
+    
+    server = GameServer(host=args.host, port=args.port, stats_interval=args.stats_interval,
+                        seed=args.seed, max_cached_chunks=args.chunk_cache, gen_workers=args.gen_workers,
+                        world_dir=args.world, save_interval=args.save_interval)
+    # Exit cleanly on SIGTERM so generation worker processes get shut down too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     server.start()
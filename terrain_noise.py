@@ -0,0 +1,160 @@
+import math
+
+# =====================
+# REFERENCE (SCALAR) NOISE
+# =====================
+# These are the original per-sample functions. The batch versions below must
+# produce exactly the same floats so existing terrain can be reproduced.
+def hash_function(x):
+    """True random hash without sine - uses bit manipulation"""
+    x = int(x)
+    x = (x ^ 61) ^ (x >> 13)
+    x = x * 2654435769
+    x = x ^ (x >> 16)
+    return (x & 0x7fffffff) / 2147483647.0
+
+def linear_interpolate(t):
+    """Linear interpolation - less smooth, more jagged"""
+    return t
+
+def value_noise(x, scale=1.0):
+    """Generate value noise with less smoothing for more randomness"""
+    x_scaled = x / scale
+    xi = math.floor(x_scaled)
+    xf = x_scaled - xi
+
+    # Hash based noise values
+    n0 = hash_function(xi)
+    n1 = hash_function(xi + 1)
+
+    # Less smooth interpolation for more randomness
+    u = linear_interpolate(xf)
+    return n0 * (1 - u) + n1 * u
+
+def fractal_noise(x, octaves=6, persistence=0.5, scale=50):
+    """Generate fractal brownian motion for bumpy, random terrain"""
+    total = 0
+    amplitude = 1.0
+    frequency = 1.0
+    max_amplitude = 0
+
+    for i in range(octaves):
+        # Add offset to each octave for more randomness
+        offset = i * 10000
+        total += value_noise(x * frequency + offset, scale / frequency) * amplitude
+        max_amplitude += amplitude
+        amplitude *= persistence
+        frequency *= 2.0
+
+    return (total / max_amplitude) if max_amplitude > 0 else 0
+
+# =====================
+# BATCH NOISE
+# =====================
+# Batches of neighbouring x values (e.g. a chunk-width span) fall on a small
+# range of lattice points, so each lattice hash is computed once into a table
+# and shared by every sample that touches it instead of twice per sample.
+
+def hash_table(xi_start, count):
+    """hash_function(xi) for xi in [xi_start, xi_start + count) as a list"""
+    return [
+        ((h ^ (h >> 16)) & 0x7fffffff) / 2147483647.0
+        for h in [((xi ^ 61) ^ (xi >> 13)) * 2654435769 for xi in range(xi_start, xi_start + count)]
+    ]
+
+def _lattice_noise(scaled, fallback):
+    """Interpolate lattice hashes for already-scaled sample positions"""
+    floor = math.floor
+    lattice = [floor(s) for s in scaled]
+    lo = min(lattice)
+    span = max(lattice) - lo + 2
+
+    if span > 4 * len(scaled) + 2:
+        # Samples are spread too thinly for a table to pay off
+        return fallback()
+
+    table = hash_table(lo, span)
+    # Same arithmetic as value_noise: u = s - xi, n0 * (1 - u) + n1 * u
+    return [
+        table[xi - lo] * (1 - (s - xi)) + table[xi - lo + 1] * (s - xi)
+        for s, xi in zip(scaled, lattice)
+    ]
+
+def value_noise_batch(xs, scale=1.0):
+    """value_noise for every x in xs, returned as a list"""
+    scaled = [x / scale for x in xs]
+    if not scaled:
+        return []
+    return _lattice_noise(scaled, lambda: [value_noise(x, scale) for x in xs])
+
+def fractal_noise_batch(xs, octaves=6, persistence=0.5, scale=50):
+    """fractal_noise for every x in xs, all octaves in one call"""
+    xs = list(xs)
+    if not xs:
+        return []
+    totals = None
+    amplitude = 1.0
+    frequency = 1.0
+    max_amplitude = 0
+
+    for i in range(octaves):
+        offset = i * 10000
+        octave_scale = scale / frequency
+        octave_xs = [x * frequency + offset for x in xs]
+        octave = _lattice_noise(
+            [x / octave_scale for x in octave_xs],
+            lambda: [value_noise(x, octave_scale) for x in octave_xs]
+        )
+        if totals is None:
+            # 0 + n * amplitude == n * amplitude exactly
+            totals = [n * amplitude for n in octave]
+        else:
+            totals = [t + n * amplitude for t, n in zip(totals, octave)]
+        max_amplitude += amplitude
+        amplitude *= persistence
+        frequency *= 2.0
+
+    if max_amplitude <= 0:
+        return [0] * len(xs)
+    return [t / max_amplitude for t in totals]
+
+
+if __name__ == "__main__":
+    # Accuracy and per-sample cost check: python terrain_noise.py
+    import random
+    import time
+
+    rng = random.Random(1)
+    failures = 0
+    cases = [(0, 16), (-16, 16), (1000000, 16), (-5000000, 256), (123456, 4096)]
+    cases += [(rng.randrange(-10 ** 7, 10 ** 7), rng.choice([1, 16, 64, 1024])) for _ in range(50)]
+    for start, count in cases:
+        xs = range(start, start + count)
+        for scale in (1.0, 1.875, 30, 150, 300):
+            if value_noise_batch(xs, scale) != [value_noise(x, scale) for x in xs]:
+                print(f"value_noise mismatch at x={start}..{start + count}, scale={scale}")
+                failures += 1
+        if fractal_noise_batch(xs, 5, 0.6, 30) != [fractal_noise(x, 5, 0.6, 30) for x in xs]:
+            print(f"fractal_noise mismatch at x={start}..{start + count}")
+            failures += 1
+    print(f"Accuracy: {len(cases)} ranges checked, {failures} mismatches (results must be bit-identical)")
+
+    for count in (16, 256, 4096):
+        xs = list(range(-count // 2, count // 2))
+        repeats = max(1, 20000 // count)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            [fractal_noise(x, 5, 0.6, 30) for x in xs]
+        scalar = (time.perf_counter() - start) / (repeats * count)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fractal_noise_batch(xs, 5, 0.6, 30)
+        batch = (time.perf_counter() - start) / (repeats * count)
+
+        print(f"fractal_noise, batch of {count:5d}: scalar {scalar * 1e6:6.2f} us/sample, "
+              f"batch {batch * 1e6:6.2f} us/sample ({scalar / batch:.1f}x)")
+
+    if failures:
+        raise SystemExit(1)
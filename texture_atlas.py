@@ -0,0 +1,154 @@
+import math
+import os
+
+import pygame
+
+# Block textures are <name>.png files here, named by the "texture" field in BLOCKS
+TEXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "textures")
+
+class TextureAtlas:
+    """Block textures packed into one surface, each pre-scaled to tile_size.
+
+    Packing is done once at load: every texture is scaled into its own
+    tile_size cell of a square grid and the atlas is converted to the
+    display's pixel format, so drawing a tile is a plain blit of an area of
+    one surface with no per-draw scaling or format conversion.
+    """
+
+    def __init__(self, textures, tile_size):
+        """textures is {name: Surface} of any size"""
+        self.tile_size = tile_size
+        self.areas = {}  # {name: Rect} cell of each texture in the atlas
+        columns = max(1, math.ceil(math.sqrt(len(textures))))
+        rows = max(1, -(-len(textures) // columns))
+        self.surface = pygame.Surface((columns * tile_size, rows * tile_size))
+        for i, (name, texture) in enumerate(sorted(textures.items())):
+            cell = pygame.Rect((i % columns) * tile_size, (i // columns) * tile_size, tile_size, tile_size)
+            self.surface.blit(pygame.transform.smoothscale(texture.convert_alpha(), cell.size), cell)
+            self.areas[name] = cell
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+
+    def area(self, name):
+        """Cell of a texture in the atlas, or None if it wasn't loaded"""
+        return self.areas.get(name)
+
+    def __len__(self):
+        return len(self.areas)
+
+def load_textures(names, directory=TEXTURE_DIR):
+    """{name: Surface} of every <directory>/<name>.png that exists; blocks without one keep their color"""
+    textures = {}
+    for name in set(names):
+        if not name:
+            continue
+        path = os.path.join(directory, f"{name}.png")
+        if not os.path.exists(path):
+            continue
+        try:
+            textures[name] = pygame.image.load(path)
+        except pygame.error as e:
+            print(f"Could not load texture {path}: {e}")
+    return textures
+
+def render_tiles(surface, tiles, size, tile_size, colors, textures, atlas):
+    """Draw size x size row-major block ids onto surface.
+
+    colors is {block id: color} and textures {block id: atlas Rect}; a block
+    with a texture is blitted from the atlas, one with only a color is filled
+    (one fill per horizontal run), anything else is left as it is. Textured
+    tiles are drawn with a single Surface.blits call.
+    """
+    blits = []
+    for ly in range(size):
+        row = ly * size
+        y = ly * tile_size
+        lx = 0
+        while lx < size:
+            tile_id = tiles[row + lx]
+            area = textures.get(tile_id)
+            if area is not None:
+                blits.append((atlas, (lx * tile_size, y), area))
+                lx += 1
+                continue
+            run = lx + 1
+            while run < size and tiles[row + run] == tile_id:
+                run += 1
+            color = colors.get(tile_id)
+            if color is not None:
+                surface.fill(color, (lx * tile_size, y, (run - lx) * tile_size, tile_size))
+            lx = run
+    if blits:
+        surface.blits(blits, doreturn=False)
+
+
+if __name__ == "__main__":
+    # Headless textured vs flat-color rendering benchmark: python texture_atlas.py
+    import random
+    import time
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    width, height = 3840, 2160
+    screen = pygame.display.set_mode((width, height))
+
+    from game_data import BLOCK_REGISTRY, BlockRegistry
+    from world_gen import generate_chunk
+    from world_chunk import CHUNK_SIZE
+
+    tile_size = 40
+    chunk_pixels = tile_size * CHUNK_SIZE
+    rng = random.Random(1)
+
+    # Stand-in 16x16 textures: each block's color with per-pixel noise
+    textures = {}
+    for block_id, index in enumerate(BLOCK_REGISTRY.textures):
+        if index is not None:
+            texture = pygame.Surface((16, 16))
+            for y in range(16):
+                for x in range(16):
+                    shade = rng.randint(-25, 25)
+                    texture.set_at((x, y), [max(0, min(255, c + shade)) for c in BLOCK_REGISTRY.colors[block_id]])
+            textures[BLOCK_REGISTRY.texture_names[index]] = texture
+
+    start = time.perf_counter()
+    atlas = TextureAtlas(textures, tile_size)
+    print(f"Atlas: {len(atlas)} textures packed into {atlas.surface.get_size()} in "
+          f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+    block_ids = [block_id for block_id in range(1, BlockRegistry.SIZE) if block_id in BLOCK_REGISTRY]
+    colors = {block_id: BLOCK_REGISTRY.colors[block_id] for block_id in block_ids}
+    block_textures = {
+        block_id: atlas.area(BLOCK_REGISTRY.texture_names[BLOCK_REGISTRY.textures[block_id]]) for block_id in block_ids
+    }
+    chunks = [generate_chunk(cx, cy, seed=1).to_raw() for cx in range(-8, 8) for cy in range(0, 6)]
+
+    def render_all(textures_by_id):
+        surfaces = []
+        start = time.perf_counter()
+        for tiles in chunks:
+            surface = pygame.Surface((chunk_pixels, chunk_pixels)).convert()
+            surface.fill((255, 255, 255))
+            render_tiles(surface, tiles, CHUNK_SIZE, tile_size, colors, textures_by_id, atlas.surface)
+            surfaces.append(surface)
+        return surfaces, (time.perf_counter() - start) / len(chunks) * 1000
+
+    def frame_time(surfaces, frames=30):
+        # One blit per visible chunk, as the client composites a full redraw
+        columns = width // chunk_pixels + 2
+        start = time.perf_counter()
+        for f in range(frames):
+            screen.fill((255, 255, 255))
+            for i in range(columns * (height // chunk_pixels + 2)):
+                surface = surfaces[(i + f) % len(surfaces)]
+                screen.blit(surface, ((i % columns) * chunk_pixels - f, (i // columns) * chunk_pixels - f))
+        return (time.perf_counter() - start) / frames * 1000
+
+    flat_surfaces, flat_chunk = render_all({})
+    textured_surfaces, textured_chunk = render_all(block_textures)
+    flat_frame = frame_time(flat_surfaces)
+    textured_frame = frame_time(textured_surfaces)
+    print(f"Render one chunk surface: flat {flat_chunk:.3f}ms, textured {textured_chunk:.3f}ms")
+    print(f"Full {width}x{height} redraw from chunk surfaces: flat {flat_frame:.2f}ms, textured {textured_frame:.2f}ms")
+    if textured_frame > flat_frame * 1.1:
+        raise SystemExit("textured rendering costs more per frame than flat colors")
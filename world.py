@@ -0,0 +1,890 @@
+import os
+import time
+import queue
+import random
+import itertools
+import threading
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from world_gen import column_cache, generate_chunk, generate_chunk_counted, ignore_interrupts, CHUNK_SIZE
+from edit_log import EditLog
+
+# Generated chunks kept in memory. Untouched chunks are cheap to drop because
+# they can always be regenerated from the seed.
+MAX_CACHED_CHUNKS = 1024
+
+# Approximate memory per cached chunk (Chunk + palette + packed tiles + cache entry),
+# for turning a memory budget into a chunk count
+CHUNK_BYTES = 500
+
+# Chunks within this many chunks of a player are never evicted
+# (clients preload a radius of 2 around themselves)
+PLAYER_CHUNK_RADIUS = 3
+
+# Seconds of history behind the reported eviction rate
+EVICTION_RATE_WINDOW = 60.0
+
+# Evicted dirty chunks waiting for writeback before an early save is triggered
+EVICTED_DIRTY_SAVE_THRESHOLD = 64
+
+# Per-chunk locks: chunk keys hash onto this many stripes
+LOCK_STRIPES = 64
+
+# Edits remembered per chunk for delta sync, and chunks with a journal
+CHUNK_JOURNAL_LENGTH = 64
+MAX_JOURNALS = 4096
+
+# Most tiles one fill/replace/place_blocks call may change
+MAX_BULK_EDIT_TILES = 65536
+
+# Chunks written per batch when streaming a snapshot
+SNAPSHOT_BATCH = 256
+
+# Recent place_block latencies kept for snapshot reports
+EDIT_LATENCY_SAMPLES = 4096
+
+# Worker processes used for chunk generation (0 = generate on the calling thread)
+DEFAULT_GEN_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Seconds between background writebacks of changed chunks to storage
+DEFAULT_SAVE_INTERVAL = 5.0
+
+def load_world_meta(storage, seed=None):
+    """Metadata of the world in storage; a new world is given seed (random if None) and saved"""
+    meta = storage.load_meta()
+    if "seed" in meta:
+        if seed is not None and seed != meta["seed"]:
+            print(f"Ignoring seed {seed}: world in {storage.path} uses seed {meta['seed']}")
+    else:
+        meta["seed"] = random.randrange(2 ** 31) if seed is None else seed
+        storage.save_meta(meta)
+    return meta
+
+class World:
+    """Server-side world state.
+
+    Chunks are generated deterministically from the world seed, so only the
+    blocks players have changed need to be kept. Materialized chunks live in a
+    bounded LRU cache and are rebuilt (generate + apply edits) on demand.
+    Chunks around connected players (see update_player) are kept resident;
+    past the cap the least recently requested of the rest are dropped.
+
+    Generation for request_chunk runs in a process pool so it doesn't hold the
+    GIL on client threads. Requests for a chunk that is already being
+    generated are queued onto the in-flight job instead of starting another.
+    Finished jobs are handed to a delivery thread that stores the chunk and
+    runs the callbacks, so the pool's own thread never waits on them.
+
+    If a WorldStorage is given, the seed is read from (or saved to) it and
+    chunks saved there (e.g. by pregeneration) are loaded instead of generated.
+    Dirty chunks are written back in bulk by a background thread; once a
+    chunk is on disk its entries in the edit diff are no longer needed.
+
+    With storage, every edit is also appended to a write-ahead EditLog in the
+    world folder, so edits made since the last writeback survive a crash. The
+    log is replayed on startup, and each writeback compacts it by dropping
+    the segments whose edits are now in the saved chunks.
+
+    Locking: per-chunk state (edits, pending requests, building a chunk) is
+    guarded by one of LOCK_STRIPES stripe locks picked by chunk key, so work
+    on different chunks runs concurrently. self.lock only guards the cache
+    structure and counters and is held briefly (stripe, then self.lock, never
+    the reverse). Published chunks are never modified: an edit publishes an
+    edited copy, so cached chunks can be read and sent without any lock.
+    """
+
+    def __init__(self, seed=None, max_cached_chunks=MAX_CACHED_CHUNKS, gen_workers=DEFAULT_GEN_WORKERS,
+                 storage=None, save_interval=DEFAULT_SAVE_INTERVAL):
+        self.storage = storage
+        meta = {}
+        if storage is not None:
+            meta = load_world_meta(storage, seed)
+            seed = meta["seed"]
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+        self.seed = seed
+        self.max_cached_chunks = max_cached_chunks
+        self.chunks = OrderedDict()  # {(cx, cy): Chunk} LRU cache
+        self.edits = {}  # {(cx, cy): {(lx, ly): block_type}} player edits not yet saved
+        self.evicted_dirty = {}  # {(cx, cy): Chunk} dropped from the cache but not yet saved
+        self.pending = {}  # {(cx, cy): [callback, ...]} chunks being generated
+        self.player_chunks = {}  # {player_id: (cx, cy)} chunk each player is in
+        self.pinned = set()  # (cx, cy) near a player, never evicted
+        self.eviction_times = deque()  # time.monotonic() of recent evictions
+        self.lock = threading.Lock()  # Cache order, evicted_dirty, players and counters
+        self.stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.chunks_generated = 0
+        self.chunks_loaded = 0
+        self.chunks_dropped = 0
+        self.requests_deduplicated = 0
+        self.worker_cache_hits = 0  # Column cache counts reported back by generation workers
+        self.worker_cache_misses = 0
+        self.chunks_saved = 0
+        self.last_save_time = 0.0
+        self.edit_latency = deque(maxlen=EDIT_LATENCY_SAMPLES)  # Seconds per place_block
+        # Logical clock, advanced once per edit. Also the chunk version: a chunk's
+        # version is the tick of its last edit. The high-water mark is kept in the
+        # world metadata so ticks are never reused across restarts.
+        self.tick = meta.get("tick", 0)
+        self.saved_tick = self.tick
+        self.versions = {}  # {(cx, cy): tick} chunks edited since startup
+        self.journals = OrderedDict()  # {(cx, cy): deque of (tick, lx, ly, block_type)} recent edits
+        self.journal_floors = {}  # {(cx, cy): tick} journal holds every edit after this version
+
+        self.edit_log = None
+        if storage is not None:
+            self.edit_log = EditLog(os.path.join(storage.path, "log"))
+            replayed = self.edit_log.replay()
+            for tile_x, tile_y, block_type, tick in replayed:
+                self._record_edits((tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE), [(tile_x, tile_y, block_type)])
+                self.tick = max(self.tick, tick)
+            if replayed:
+                print(f"Replayed {len(replayed)} edits from {self.edit_log.path}")
+        # Every chunk not edited since startup has this version
+        self.start_tick = self.tick
+        self.ticks = itertools.count(self.tick + 1)
+
+        self.pool = None
+        self.generated = queue.Queue()  # (key, Future) of finished generation jobs; None stops delivery
+        self.delivery_thread = None
+        if gen_workers > 0:
+            # spawn rather than fork: forking a process with live server
+            # threads can copy locks in a held state
+            self.pool = ProcessPoolExecutor(
+                max_workers=gen_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=ignore_interrupts
+            )
+            self.delivery_thread = threading.Thread(target=self._delivery_loop, daemon=True)
+            self.delivery_thread.start()
+
+        self.save_interval = save_interval
+        self.stop_saving = threading.Event()
+        self.save_requested = threading.Event()  # Wakes the saver before the interval is up
+        self.save_lock = threading.Lock()  # One writer to storage at a time: flush or snapshot
+        self.save_thread = None
+        if storage is not None and save_interval > 0:
+            self.save_thread = threading.Thread(target=self._save_loop, daemon=True)
+            self.save_thread.start()
+
+    def get_chunk(self, cx, cy):
+        """Get a chunk, loading or generating it (exactly once) if it isn't resident"""
+        key = (cx, cy)
+        chunk = self._lookup(key)
+        if chunk is not None:
+            return chunk
+        with self._stripe(key):
+            # Whoever holds the stripe builds the chunk; threads waiting on it find it resident
+            return self._get_locked(key)
+
+    def _get_locked(self, key):
+        """Resident chunk, loaded or generated if needed (call with the stripe held)"""
+        chunk = self._resident(key)
+        if chunk is None:
+            chunk = self._load_stored(key)
+            if chunk is None:
+                chunk = self._generate(*key)
+            chunk = self._store_chunk(key, chunk)
+        return chunk
+
+    def request_chunk(self, cx, cy, callback):
+        """Get a chunk asynchronously; callback(chunk) is called once it is ready.
+
+        The callback runs on the calling thread if the chunk is cached or
+        stored, otherwise on the delivery thread. Callbacks for generated
+        chunks share that thread, so they should hand the chunk off (e.g. to
+        a queue) rather than block.
+        """
+        key = (cx, cy)
+        chunk = self._lookup(key)
+        if chunk is None:
+            with self._stripe(key):
+                chunk = self._resident(key)
+                if chunk is None:
+                    if key in self.pending:
+                        self.pending[key].append(callback)
+                        with self.lock:
+                            self.requests_deduplicated += 1
+                        return
+                    self.pending[key] = [callback]
+
+        if chunk is not None:
+            callback(chunk)
+            return
+
+        chunk = self._load_stored(key)
+        if chunk is not None:
+            self._chunk_ready(key, chunk)
+        elif self.pool is None:
+            self._chunk_ready(key, self._generate(cx, cy))
+        else:
+            future = self.pool.submit(generate_chunk_counted, cx, cy, self.seed)
+            # Runs on the pool's management thread: only queue the result
+            future.add_done_callback(lambda f: self.generated.put((key, f)))
+
+    def _stripe(self, key):
+        """Lock guarding one chunk's edits, pending requests and generation"""
+        return self.stripes[hash(key) % LOCK_STRIPES]
+
+    @contextmanager
+    def _all_stripes(self):
+        """Hold every stripe (always taken in index order), stopping all chunk edits"""
+        for stripe in self.stripes:
+            stripe.acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(self.stripes):
+                stripe.release()
+
+    def _lookup(self, key):
+        """Lock-free read of a cached chunk (a dict get is atomic under the GIL)"""
+        chunk = self.chunks.get(key)
+        if chunk is not None and self.lock.acquire(blocking=False):
+            # Refresh its LRU position, but only if that doesn't mean waiting
+            try:
+                if key in self.chunks:
+                    self.chunks.move_to_end(key)
+            finally:
+                self.lock.release()
+        return chunk
+
+    def _resident(self, key):
+        """Chunk from the cache (or awaiting writeback), or None"""
+        with self.lock:
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                self.chunks.move_to_end(key)
+                return chunk
+            chunk = self.evicted_dirty.pop(key, None)
+            if chunk is not None:
+                self._cache(key, chunk)
+            return chunk
+
+    def _generate(self, cx, cy):
+        with self.lock:
+            self.chunks_generated += 1
+        return generate_chunk(cx, cy, self.seed)
+
+    def _load_stored(self, key):
+        if self.storage is None:
+            return None
+        chunk = self.storage.load_chunk(*key)
+        if chunk is not None:
+            with self.lock:
+                self.chunks_loaded += 1
+        return chunk
+
+    def _delivery_loop(self):
+        while True:
+            job = self.generated.get()
+            if job is None:
+                return
+            try:
+                self._generation_done(*job)
+            except Exception as e:
+                print(f"Chunk delivery error for {job[0]}: {e}")
+
+    def _generation_done(self, key, future):
+        try:
+            chunk, cache_hits, cache_misses = future.result()
+            with self.lock:
+                self.chunks_generated += 1
+                self.worker_cache_hits += cache_hits
+                self.worker_cache_misses += cache_misses
+        except Exception as e:
+            # Worker died or pool was shut down - generate here instead
+            print(f"Chunk generation for {key} failed in worker: {e}")
+            chunk = self._generate(*key)
+        self._chunk_ready(key, chunk)
+
+    def _chunk_ready(self, key, chunk):
+        with self._stripe(key):
+            chunk = self._store_chunk(key, chunk)
+            callbacks = self.pending.pop(key, [])
+        for callback in callbacks:
+            try:
+                callback(chunk)
+            except Exception as e:
+                print(f"Chunk callback error for {key}: {e}")
+
+    def _store_chunk(self, key, chunk):
+        """Apply edits to a freshly loaded/generated chunk and cache it (call with the stripe held)"""
+        resident = self._resident(key)
+        if resident is not None:
+            # Another thread got there first
+            return resident
+        for (lx, ly), block_type in self.edits.get(key, {}).items():
+            chunk.set(lx, ly, block_type)
+        chunk.version = self.versions.get(key, self.start_tick)
+        with self.lock:
+            self._cache(key, chunk)
+        return chunk
+
+    def _cache(self, key, chunk):
+        """Add to the LRU cache, dropping the coldest unpinned chunks (call with lock held)"""
+        self.chunks[key] = chunk
+        skipped = 0
+        while len(self.chunks) > self.max_cached_chunks and skipped < len(self.chunks):
+            old_key = next(iter(self.chunks))
+            if old_key in self.pinned:
+                # Near a player: treat as recently used and look further
+                self.chunks.move_to_end(old_key)
+                skipped += 1
+                continue
+            old_chunk = self.chunks.pop(old_key)
+            if old_chunk.dirty and self.storage is not None:
+                # Keep it until it has been written back
+                self.evicted_dirty[old_key] = old_chunk
+                if len(self.evicted_dirty) >= EVICTED_DIRTY_SAVE_THRESHOLD:
+                    self.save_requested.set()
+            self.chunks_dropped += 1
+            self.eviction_times.append(time.monotonic())
+        # Over the cap only if every remaining chunk is pinned
+
+    # =====================
+    # PLAYERS
+    # =====================
+    def update_player(self, player_id, cx, cy):
+        """Record which chunk a player is in so the chunks around it stay resident"""
+        if self.player_chunks.get(player_id) == (cx, cy):
+            return
+        with self.lock:
+            self.player_chunks[player_id] = (cx, cy)
+            self._update_pinned()
+
+    def remove_player(self, player_id):
+        with self.lock:
+            if self.player_chunks.pop(player_id, None) is not None:
+                self._update_pinned()
+
+    def _update_pinned(self):
+        """Recompute the chunks near any player (call with lock held)"""
+        r = PLAYER_CHUNK_RADIUS
+        self.pinned = {
+            (px + dx, py + dy)
+            for px, py in self.player_chunks.values()
+            for dx in range(-r, r + 1)
+            for dy in range(-r, r + 1)
+        }
+
+    def eviction_rate(self):
+        """Chunks evicted per second over the last EVICTION_RATE_WINDOW seconds"""
+        with self.lock:
+            cutoff = time.monotonic() - EVICTION_RATE_WINDOW
+            while self.eviction_times and self.eviction_times[0] < cutoff:
+                self.eviction_times.popleft()
+            return len(self.eviction_times) / EVICTION_RATE_WINDOW
+
+    def place_block(self, tile_x, tile_y, block_type):
+        """Record a player edit and apply it to the cached chunk if present; returns its tick"""
+        start = time.perf_counter()
+        key = (tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE)
+        with self._stripe(key):
+            tick = self._apply_edits(key, [(tile_x, tile_y, block_type)])
+        self.edit_latency.append(time.perf_counter() - start)
+        return tick
+
+    # =====================
+    # BULK EDITS
+    # =====================
+    def place_blocks(self, edits):
+        """Apply many (tile_x, tile_y, block_type) edits, one chunk at a time.
+
+        Each chunk's edits are logged and applied under one stripe hold and
+        publish one new chunk version. Returns
+        {(cx, cy): (new version, [(tile_x, tile_y, block_type), ...])}.
+        """
+        by_chunk = {}
+        for tile_x, tile_y, block_type in edits:
+            by_chunk.setdefault((tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE), []).append((tile_x, tile_y, block_type))
+        if sum(len(e) for e in by_chunk.values()) > MAX_BULK_EDIT_TILES:
+            raise ValueError(f"bulk edits are limited to {MAX_BULK_EDIT_TILES} tiles")
+        changes = {}
+        for key, chunk_edits in by_chunk.items():
+            with self._stripe(key):
+                changes[key] = (self._apply_edits(key, chunk_edits), chunk_edits)
+        return changes
+
+    def fill(self, x0, y0, x1, y1, block_type):
+        """Set every tile in the rectangle (inclusive) to block_type; returns changes as place_blocks"""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_BULK_EDIT_TILES:
+            raise ValueError(f"bulk edits are limited to {MAX_BULK_EDIT_TILES} tiles")
+        return self.place_blocks(
+            (x, y, block_type) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)
+        )
+
+    def replace(self, x0, y0, x1, y1, old_type, new_type):
+        """Turn every old_type tile in the rectangle (inclusive) into new_type; returns changes as place_blocks"""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_BULK_EDIT_TILES:
+            raise ValueError(f"bulk edits are limited to {MAX_BULK_EDIT_TILES} tiles")
+        changes = {}
+        for cx in range(x0 // CHUNK_SIZE, x1 // CHUNK_SIZE + 1):
+            for cy in range(y0 // CHUNK_SIZE, y1 // CHUNK_SIZE + 1):
+                key = (cx, cy)
+                with self._stripe(key):
+                    # Read and write under one stripe hold so no edit slips in between
+                    chunk = self._get_locked(key)
+                    chunk_edits = [
+                        (x, y, new_type)
+                        for y in range(max(y0, cy * CHUNK_SIZE), min(y1, cy * CHUNK_SIZE + CHUNK_SIZE - 1) + 1)
+                        for x in range(max(x0, cx * CHUNK_SIZE), min(x1, cx * CHUNK_SIZE + CHUNK_SIZE - 1) + 1)
+                        if chunk.get(x % CHUNK_SIZE, y % CHUNK_SIZE) == old_type
+                    ]
+                    if chunk_edits:
+                        changes[key] = (self._apply_edits(key, chunk_edits), chunk_edits)
+        return changes
+
+    def _apply_edits(self, key, edits):
+        """Log, journal and record one chunk's edits (stripe held); returns the chunk's new version"""
+        journal = self.journals.get(key)
+        if journal is None:
+            journal = deque(maxlen=CHUNK_JOURNAL_LENGTH)
+            with self.lock:
+                self.journal_floors[key] = self.versions.get(key, self.start_tick)
+                self.journals[key] = journal
+                while len(self.journals) > MAX_JOURNALS:
+                    old_key, _ = self.journals.popitem(last=False)
+                    self.journal_floors.pop(old_key, None)
+        for tile_x, tile_y, block_type in edits:
+            tick = self.tick = next(self.ticks)
+            if self.edit_log is not None:
+                # Appended under the stripe so the log order matches the edit order for each chunk
+                self.edit_log.append(tile_x, tile_y, block_type, tick)
+            if len(journal) == journal.maxlen:
+                with self.lock:
+                    self.journal_floors[key] = journal[0][0]  # About to be dropped
+            journal.append((tick, tile_x % CHUNK_SIZE, tile_y % CHUNK_SIZE, block_type))
+        self.versions[key] = tick
+        self._record_edits(key, edits, tick)
+        return tick
+
+    def _record_edits(self, key, edits, version=None):
+        """Add one chunk's edits to the diff and publish one edited version of it (stripe held)"""
+        diff = self.edits.setdefault(key, {})
+        for tile_x, tile_y, block_type in edits:
+            diff[(tile_x % CHUNK_SIZE, tile_y % CHUNK_SIZE)] = block_type
+        with self.lock:
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                chunk = self.evicted_dirty.get(key)
+        if chunk is None:
+            return
+        edited = chunk.copy()
+        for tile_x, tile_y, block_type in edits:
+            edited.set(tile_x % CHUNK_SIZE, tile_y % CHUNK_SIZE, block_type)
+        if version is not None:
+            edited.version = version
+        # copy() starts clean: a no-op edit must not hide earlier unsaved ones
+        # from the next flush, which drops their edit log segments
+        edited.dirty = edited.dirty or chunk.dirty
+        if edited.dirty or edited.version != chunk.version:
+            self._replace(key, chunk, edited)
+
+    def chunk_delta(self, cx, cy, version):
+        """Bring a client's copy of a chunk at `version` up to date without resending it.
+
+        Returns (current version, [(lx, ly, block_type), ...] edits since
+        `version`), with no edits if it is already current, or None if the
+        journal no longer reaches back that far and the full chunk is needed.
+        """
+        key = (cx, cy)
+        with self._stripe(key):
+            current = self.versions.get(key, self.start_tick)
+            if version == current:
+                return current, []
+            with self.lock:
+                journal = self.journals.get(key)
+                if journal is None or version > current or version < self.journal_floors[key]:
+                    return None
+                self.journals.move_to_end(key)
+            return current, [(lx, ly, block_type) for tick, lx, ly, block_type in journal if tick > version]
+
+    def _replace(self, key, chunk, edited):
+        """Publish a new version of a resident chunk (call with the stripe held)"""
+        with self.lock:
+            if self.chunks.get(key) is chunk:
+                self.chunks[key] = edited  # Keeps its LRU position
+            elif self.evicted_dirty.get(key) is chunk:
+                self.evicted_dirty[key] = edited
+            # Otherwise it was just dropped clean; the edit diff rebuilds it
+
+    # =====================
+    # SAVING
+    # =====================
+    def _save_loop(self):
+        while True:
+            self.save_requested.wait(self.save_interval)
+            self.save_requested.clear()
+            if self.stop_saving.is_set():
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"World save error: {e}")
+
+    def flush(self):
+        """Write every dirty chunk to storage in one bulk save and compact the edit log"""
+        if self.storage is None:
+            return 0
+        with self.save_lock:
+            return self._flush()
+
+    def _flush(self):
+        start = time.perf_counter()
+        # Commit pending log records first so rotating with every stripe held is quick
+        self.edit_log.commit()
+        with self._all_stripes():
+            # Every edit in the closed log segments is in self.edits now and
+            # gets materialized and saved below; later edits go to a new segment
+            compacted_segment = self.edit_log.rotate()
+            flush_tick = next(self.ticks)  # Above every tick issued so far
+            with self.lock:
+                unloaded = [key for key in self.edits if key not in self.chunks and key not in self.evicted_dirty]
+        for key in unloaded:
+            # Edited but never loaded (or dropped clean before the edit): build it so it can be saved
+            self.get_chunk(*key)
+
+        with self.lock:
+            keys = [key for key, chunk in self.chunks.items() if chunk.dirty]
+            keys.extend(self.evicted_dirty)
+        items = []
+        saved = []  # (key, chunk, edits it includes)
+        for key in keys:
+            # Under the stripe the resident version includes every edit in the diff
+            with self._stripe(key):
+                with self.lock:
+                    chunk = self.chunks.get(key)
+                    if chunk is None:
+                        chunk = self.evicted_dirty.pop(key, None)
+                if chunk is None or not chunk.dirty:
+                    continue
+                items.append((key, chunk.to_bytes()))
+                chunk.dirty = False
+                saved.append((key, chunk, dict(self.edits.get(key, {}))))
+        if not items:
+            self._save_tick(flush_tick)
+            self.edit_log.drop_segments_through(compacted_segment)
+            return 0
+
+        try:
+            self.storage.save_chunks(items)
+        except Exception:
+            # Put the chunks back so they are saved next time
+            for key, chunk, _ in saved:
+                with self._stripe(key):
+                    chunk.dirty = True
+                    with self.lock:
+                        if key not in self.chunks and key not in self.evicted_dirty:
+                            self.evicted_dirty[key] = chunk
+            raise
+
+        # The diff is kept until the chunks are on disk: a chunk dropped and
+        # reloaded during the save still gets its edits applied. Now remove
+        # the saved edits, keeping any made since.
+        for key, chunk, edits in saved:
+            with self._stripe(key):
+                current = self.edits.get(key)
+                if current is None:
+                    continue
+                for tile, block_type in edits.items():
+                    if current.get(tile) == block_type:
+                        del current[tile]
+                if not current:
+                    del self.edits[key]
+
+        self._save_tick(flush_tick)
+        self.edit_log.drop_segments_through(compacted_segment)
+        self.chunks_saved += len(items)
+        self.last_save_time = time.perf_counter() - start
+        return len(items)
+
+    def _save_tick(self, tick):
+        """Record the tick high-water mark before dropping the log segments that also hold it"""
+        if tick - 1 > self.saved_tick:
+            meta = self.storage.load_meta()
+            meta["tick"] = tick
+            self.storage.save_meta(meta)
+            self.saved_tick = tick
+
+    # =====================
+    # SNAPSHOTS
+    # =====================
+    def snapshot(self, path):
+        """Write a consistent point-in-time copy of the world to path (a new world folder).
+
+        Only the capture (references to the current chunk versions plus a copy
+        of the edit diff) stops edits, for a moment. Published chunks are
+        never modified, so the captured versions stay as they were while
+        edits carry on creating new ones. Writeback waits until the snapshot
+        is done so chunks on disk still match the capture; edits made in the
+        meantime are safe in the edit log.
+        """
+        if self.storage is None:
+            raise ValueError("snapshots need a world with storage")
+        start = time.perf_counter()
+        with self.save_lock:
+            with self._all_stripes():
+                with self.lock:
+                    captured = dict(self.chunks)
+                    captured.update(self.evicted_dirty)
+                edits = {key: dict(e) for key, e in self.edits.items()}
+                tick = next(self.ticks)  # Edits before this tick are in the snapshot, later ones aren't
+                latency_before = list(self.edit_latency)
+                self.edit_latency.clear()
+            capture_time = time.perf_counter() - start
+
+            target = type(self.storage)(path)
+            meta = self.storage.load_meta()
+            meta["tick"] = tick
+            target.save_meta(meta)
+            keys = self.storage.saved_chunks() | captured.keys() | edits.keys()
+            batch = []
+            size = 0
+            for key in keys:
+                chunk = captured.get(key)
+                if chunk is None:
+                    # Only on disk (or never built): apply the captured edits to it
+                    chunk = self.storage.load_chunk(*key) or generate_chunk(*key, self.seed)
+                    for (lx, ly), block_type in edits.get(key, {}).items():
+                        chunk.set(lx, ly, block_type)
+                data = chunk.to_bytes()
+                batch.append((key, data))
+                size += len(data)
+                if len(batch) >= SNAPSHOT_BATCH:
+                    target.save_chunks(batch)
+                    batch = []
+                    time.sleep(0)  # Let client threads in between batches
+            target.save_chunks(batch)
+            target.close()
+        latency_during = list(self.edit_latency)
+
+        def percentile(samples, p):
+            return sorted(samples)[int(p * (len(samples) - 1))] if samples else None
+
+        return {
+            "path": path,
+            "tick": tick,
+            "chunks": len(keys),
+            "bytes": size,
+            "capture_time": capture_time,
+            "duration": time.perf_counter() - start,
+            "edits_during": len(latency_during),
+            "edit_p50_before": percentile(latency_before, 0.5),
+            "edit_p99_before": percentile(latency_before, 0.99),
+            "edit_p50_during": percentile(latency_during, 0.5),
+            "edit_p99_during": percentile(latency_during, 0.99),
+            "edit_max_during": max(latency_during, default=None)
+        }
+
+    def stats(self):
+        eviction_rate = self.eviction_rate()
+        with self.lock:
+            return {
+                "seed": self.seed,
+                "cached_chunks": len(self.chunks),
+                "max_cached_chunks": self.max_cached_chunks,
+                "pinned_chunks": sum(1 for key in self.pinned if key in self.chunks),
+                "eviction_rate": eviction_rate,
+                "edited_chunks": len(self.edits),
+                "edited_blocks": sum(len(e) for e in list(self.edits.values())),
+                "generated": self.chunks_generated,
+                "loaded": self.chunks_loaded,
+                "dropped": self.chunks_dropped,
+                "pending": len(self.pending),
+                "deduplicated": self.requests_deduplicated,
+                "unsaved_chunks": sum(1 for c in self.chunks.values() if c.dirty) + len(self.evicted_dirty),
+                "saved": self.chunks_saved,
+                "last_save_time": self.last_save_time,
+                "tick": self.tick,
+                "logged_edits": self.edit_log.edits_logged if self.edit_log else 0,
+                "log_commits": self.edit_log.commits if self.edit_log else 0,
+                "column_cache": self.column_cache_stats()
+            }
+
+    def column_cache_stats(self):
+        """Column cache counters: this process's cache plus the hits and misses of generation workers"""
+        cache = column_cache.stats()
+        cache["hits"] += self.worker_cache_hits
+        cache["misses"] += self.worker_cache_misses
+        total = cache["hits"] + cache["misses"]
+        cache["hit_rate"] = cache["hits"] / total if total else 0.0
+        cache["in_workers"] = self.pool is not None
+        return cache
+
+    def close(self):
+        """Save everything, then shut down the saver and generation pool"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+            self.generated.put(None)
+            self.delivery_thread.join(timeout=5)
+        if self.storage is not None:
+            self.stop_saving.set()
+            self.save_requested.set()
+            if self.save_thread is not None:
+                self.save_thread.join()
+            self.flush()
+            self.edit_log.close()
+            self.storage.close()
+
+
+if __name__ == "__main__":
+    # Concurrency stress test: python world.py
+    import shutil
+    import tempfile
+
+    from world_storage import WorldStorage
+
+    width, height = 8 * CHUNK_SIZE, 4 * CHUNK_SIZE  # 32 chunks
+
+    def hammer(world, threads, total_ops):
+        """Mixed chunk reads and edits from many threads; returns ({tile: last block}, seconds, errors)"""
+        expected = [{} for _ in range(threads)]
+        errors = []
+
+        def worker(t):
+            rng = random.Random(t)
+            try:
+                for _ in range(total_ops // threads):
+                    if rng.random() < 0.3:
+                        # Each thread owns every threads-th column, so its last write must win
+                        x = rng.randrange(width // threads) * threads + t
+                        y = rng.randrange(height)
+                        block_type = rng.randrange(1, 16)
+                        world.place_block(x, y, block_type)
+                        expected[t][(x, y)] = block_type
+                    else:
+                        x, y = rng.randrange(width), rng.randrange(height)
+                        world.get_chunk(x // CHUNK_SIZE, y // CHUNK_SIZE).get(x % CHUNK_SIZE, y % CHUNK_SIZE)
+            except Exception as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        return {tile: b for e in expected for tile, b in e.items()}, elapsed, errors
+
+    def lost_updates(world, expected):
+        return sum(
+            world.get_chunk(x // CHUNK_SIZE, y // CHUNK_SIZE).get(x % CHUNK_SIZE, y % CHUNK_SIZE) != block_type
+            for (x, y), block_type in expected.items()
+        )
+
+    # Atomic get-or-generate: many threads asking for the same chunks at once
+    world = World(seed=1, gen_workers=0)
+    keys = [(cx, cy) for cx in range(16) for cy in range(4)]
+    racers = [threading.Thread(target=lambda: [world.get_chunk(*key) for key in keys]) for _ in range(8)]
+    for r in racers:
+        r.start()
+    for r in racers:
+        r.join()
+    print(f"get-or-generate: 8 threads x {len(keys)} chunks -> {world.chunks_generated} generated (expect {len(keys)})")
+    assert world.chunks_generated == len(keys)
+
+    # Edits and reads from many threads, with a small cache (constant eviction and
+    # regeneration) and a saver flushing every 50ms underneath
+    path = tempfile.mkdtemp()
+    failures = 0
+    try:
+        for threads in (1, 2, 4, 8, 16):
+            shutil.rmtree(path)
+            world = World(seed=1, max_cached_chunks=16, gen_workers=0, storage=WorldStorage(path), save_interval=0.05)
+            expected, elapsed, errors = hammer(world, threads, 40000)
+            lost = lost_updates(world, expected)
+            world.close()
+            world = World(max_cached_chunks=16, gen_workers=0, storage=WorldStorage(path), save_interval=0)
+            lost_on_disk = lost_updates(world, expected)
+            world.close()
+            failures += len(errors) + lost + lost_on_disk
+            print(f"{threads:2d} threads: {40000 / elapsed:8.0f} ops/s, {len(expected)} tiles edited, "
+                  f"{lost} lost updates, {lost_on_disk} lost after reopening, {len(errors)} errors")
+    finally:
+        shutil.rmtree(path)
+
+    # Edits that change nothing (the same block again, a fill or replace over
+    # tiles that already match) right after real ones, then close: the real
+    # edits must still be saved
+    path = tempfile.mkdtemp()
+    try:
+        repeats = {
+            "same block": lambda world: world.place_block(3, 3, 7),
+            "fill": lambda world: world.fill(3, 3, 4, 3, 7),
+            "replace": lambda world: world.replace(0, 0, 15, 15, 7, 7),
+        }
+        for name, repeat in repeats.items():
+            shutil.rmtree(path, ignore_errors=True)
+            world = World(seed=1, gen_workers=0, storage=WorldStorage(path), save_interval=0)
+            world.get_chunk(0, 0)
+            world.place_blocks([(3, 3, 7), (4, 3, 7)])
+            repeat(world)
+            world.close()
+            world = World(gen_workers=0, storage=WorldStorage(path), save_interval=0)
+            lost = lost_updates(world, {(3, 3): 7, (4, 3): 7})
+            world.close()
+            failures += lost
+            print(f"repeat edit ({name}): {lost} lost after reopening")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    # Snapshot under load: a steady stream of edits keeps running while a
+    # 2048-chunk world is copied; the copy must hold exactly the state at capture
+    path = tempfile.mkdtemp()
+    try:
+        world = World(seed=1, gen_workers=0, storage=WorldStorage(path), save_interval=0)
+        world.storage.save_chunks([((cx, cy), world._generate(cx, cy).to_bytes())
+                                   for cx in range(-64, 64) for cy in range(-4, 12)])
+        tiles = [(x, y) for x in range(-1000, 1000, 3) for y in (40, 41)]
+        expected = {tile: world.get_chunk(tile[0] // CHUNK_SIZE, tile[1] // CHUNK_SIZE).get(
+            tile[0] % CHUNK_SIZE, tile[1] % CHUNK_SIZE) for tile in tiles}
+        edits = []  # (tick, tile, block_type)
+
+        stop = threading.Event()
+        def editor():
+            rng = random.Random(1)
+            while not stop.is_set():
+                tile = rng.choice(tiles)
+                block_type = rng.randrange(1, 16)
+                edits.append((world.place_block(*tile, block_type), tile, block_type))
+                time.sleep(0.0005)
+        editing = threading.Thread(target=editor)
+        editing.start()
+        time.sleep(0.5)
+        result = world.snapshot(path + "-snapshot")
+        stop.set()
+        editing.join()
+        world.close()
+        for tick, tile, block_type in sorted(edits):
+            if tick < result["tick"]:
+                expected[tile] = block_type
+
+        def us(seconds):
+            return f"{seconds * 1e6:.0f}us" if seconds is not None else "-"
+        print(f"snapshot: {result['chunks']} chunks ({result['bytes'] / 1024:.0f} KB) in {result['duration'] * 1000:.0f}ms, "
+              f"edits paused {result['capture_time'] * 1000:.2f}ms for the capture")
+        print(f"place_block latency: before p50 {us(result['edit_p50_before'])} p99 {us(result['edit_p99_before'])}, "
+              f"during p50 {us(result['edit_p50_during'])} p99 {us(result['edit_p99_during'])} "
+              f"max {us(result['edit_max_during'])} ({result['edits_during']} edits)")
+
+        copy = World(gen_workers=0, storage=WorldStorage(path + "-snapshot"), save_interval=0)
+        wrong = sum(copy.get_chunk(x // CHUNK_SIZE, y // CHUNK_SIZE).get(x % CHUNK_SIZE, y % CHUNK_SIZE) != block_type
+                    for (x, y), block_type in expected.items())
+        copy.close()
+        print(f"snapshot consistency: {wrong} tiles differ from the captured state")
+        failures += wrong
+    finally:
+        shutil.rmtree(path)
+        shutil.rmtree(path + "-snapshot", ignore_errors=True)
+    if failures:
+        raise SystemExit(1)
@@ -0,0 +1,225 @@
+CHUNK_SIZE = 16
+CHUNK_AREA = CHUNK_SIZE * CHUNK_SIZE
+
+# Bits per tile index for a palette of n block ids (0 = uniform chunk, no tile data)
+PALETTE_BITS = (0, 1, 2, 4, 8)
+
+def bits_for_palette(n):
+    for bits in PALETTE_BITS:
+        if n <= 1 << bits:
+            return bits
+    raise ValueError(f"palette of {n} block ids is too large")
+
+def pack_indices(indices, bits):
+    """Pack 256 palette indices (one per byte) into bits-wide little-endian fields"""
+    if bits == 8:
+        return bytearray(indices)
+    if bits == 0:
+        return bytearray()
+    per_byte = 8 // bits
+    # Every index fits in its bits, so shifting whole strides of bytes never carries
+    packed = 0
+    for k in range(per_byte):
+        packed |= int.from_bytes(indices[k::per_byte], "little") << (k * bits)
+    return bytearray(packed.to_bytes(CHUNK_AREA // per_byte, "little"))
+
+def unpack_indices(data, bits):
+    """Inverse of pack_indices: 256 palette indices, one per byte"""
+    if bits == 8:
+        return bytearray(data)
+    if bits == 0:
+        return bytearray(CHUNK_AREA)
+    per_byte = 8 // bits
+    length = CHUNK_AREA // per_byte
+    packed = int.from_bytes(data, "little")
+    field_mask = int.from_bytes(bytes([(1 << bits) - 1]) * length, "little")
+    indices = bytearray(CHUNK_AREA)
+    for k in range(per_byte):
+        indices[k::per_byte] = ((packed >> (k * bits)) & field_mask).to_bytes(length, "little")
+    return indices
+
+class Chunk:
+    """16x16 block ids stored as a palette plus bit-packed palette indices.
+
+    A chunk only uses a handful of block ids, so each tile stores an index
+    into the chunk's palette in 0, 1, 2, 4 or 8 bits. A uniform chunk (all
+    air, all stone) has no tile data at all. Index with get(lx, ly) /
+    set(lx, ly, block_id); set grows the palette and repacks when needed.
+
+    to_bytes() is the same encoding, used on the wire and on disk:
+        bits, palette length - 1, palette ids, packed indices
+
+    version is the world tick of the chunk's last edit (set by the server,
+    sent alongside the encoding rather than inside it).
+    """
+
+    __slots__ = ("palette", "bits", "data", "dirty", "version")
+
+    def __init__(self, tiles=None):
+        if tiles is None:
+            self.palette = bytearray(1)  # Block ids, indexed by the packed tile values
+            self.bits = 0
+            self.data = bytearray()
+        else:
+            if len(tiles) != CHUNK_AREA:
+                raise ValueError(f"chunk data must be {CHUNK_AREA} bytes, got {len(tiles)}")
+            self._pack(tiles)
+        self.dirty = False  # Changed since it was last saved
+        self.version = 0
+
+    def _pack(self, tiles):
+        """Build palette and packed data from 256 raw block ids"""
+        self.palette = bytearray(sorted(set(tiles)))
+        self.bits = bits_for_palette(len(self.palette))
+        to_index = bytearray(256)
+        for i, block_id in enumerate(self.palette):
+            to_index[block_id] = i
+        self.data = pack_indices(bytes(tiles).translate(to_index), self.bits)
+
+    def get(self, lx, ly):
+        bits = self.bits
+        if bits == 0:
+            return self.palette[0]
+        i = (ly * CHUNK_SIZE + lx) * bits
+        return self.palette[(self.data[i >> 3] >> (i & 7)) & ((1 << bits) - 1)]
+
+    def set(self, lx, ly, block_id):
+        if self.get(lx, ly) == block_id:
+            return
+        self.dirty = True
+        if block_id in self.palette:
+            index = self.palette.index(block_id)
+        elif len(self.palette) < 1 << self.bits:
+            index = len(self.palette)
+            self.palette.append(block_id)
+        else:
+            # Palette is full at this width: repack from raw ids
+            tiles = self.to_raw()
+            tiles[ly * CHUNK_SIZE + lx] = block_id
+            self._pack(tiles)
+            return
+        i = (ly * CHUNK_SIZE + lx) * self.bits
+        shift = i & 7
+        mask = ((1 << self.bits) - 1) << shift
+        self.data[i >> 3] = (self.data[i >> 3] & ~mask) | (index << shift)
+
+    def to_raw(self):
+        """All 256 block ids, row-major, as a bytearray"""
+        if self.bits == 0:
+            return bytearray([self.palette[0]]) * CHUNK_AREA
+        return unpack_indices(self.data, self.bits).translate(self.palette + bytes(256 - len(self.palette)))
+
+    def to_bytes(self):
+        """Palette encoding for the wire/disk"""
+        return bytes([self.bits, len(self.palette) - 1]) + self.palette + self.data
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) == CHUNK_AREA:
+            # Raw 256-byte tiles (chunks saved before palette encoding)
+            return cls(data)
+        chunk = cls()
+        bits, palette_size = data[0], data[1] + 1
+        chunk.bits = bits
+        chunk.palette = bytearray(data[2:2 + palette_size])
+        chunk.data = bytearray(data[2 + palette_size:])
+        expected = CHUNK_AREA * bits // 8
+        if bits not in PALETTE_BITS or palette_size > 1 << bits or len(chunk.data) != expected:
+            raise ValueError(f"bad chunk encoding: {bits} bits, {palette_size} ids, {len(chunk.data)} bytes")
+        return chunk
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from the old [[id] * 16] * 16 nested list layout"""
+        return cls(bytes(block_id for row in rows for block_id in row))
+
+    def to_rows(self):
+        tiles = self.to_raw()
+        return [list(tiles[y * CHUNK_SIZE:(y + 1) * CHUNK_SIZE]) for y in range(CHUNK_SIZE)]
+
+    def copy(self):
+        chunk = Chunk()
+        chunk.palette = bytearray(self.palette)
+        chunk.bits = self.bits
+        chunk.data = bytearray(self.data)
+        chunk.version = self.version
+        return chunk
+
+    def __eq__(self, other):
+        return isinstance(other, Chunk) and self.to_raw() == other.to_raw()
+
+    def __reduce__(self):
+        # Pickle as the palette encoding (used when chunks cross process boundaries)
+        return (Chunk.from_bytes, (self.to_bytes(),))
+
+    def __repr__(self):
+        return f"Chunk({len(self.palette)} block types, {self.bits} bits/tile, dirty={self.dirty})"
+
+
+if __name__ == "__main__":
+    # Memory and serialization benchmark against nested lists: python world_chunk.py
+    import pickle
+    import sys
+    import time
+    from collections import Counter
+
+    from world_gen import generate_chunk
+
+    chunks = [generate_chunk(cx, cy, seed=1) for cx in range(-64, 64) for cy in range(-4, 8)]
+    rows = [chunk.to_rows() for chunk in chunks]
+
+    # Round trip check, including growing the palette through set()
+    for chunk, r in zip(chunks[:200], rows):
+        assert Chunk.from_bytes(chunk.to_bytes()).to_rows() == r == Chunk.from_rows(r).to_rows()
+        edited = chunk.copy()
+        raw = edited.to_raw()
+        for i, block_id in enumerate(range(16)):
+            edited.set(i, 15 - i, block_id)
+            raw[(15 - i) * CHUNK_SIZE + i] = block_id
+        assert edited.to_raw() == raw and Chunk.from_bytes(edited.to_bytes()).to_raw() == raw
+
+    widths = Counter(chunk.bits for chunk in chunks)
+    print(f"{len(chunks)} generated chunks by bits per tile: "
+          + ", ".join(f"{bits}: {widths[bits] * 100 / len(chunks):.0f}%" for bits in PALETTE_BITS))
+
+    def memory(chunk):
+        return sys.getsizeof(chunk) + sys.getsizeof(chunk.data) + sys.getsizeof(chunk.palette)
+
+    list_bytes = sum(sys.getsizeof(r) + sum(sys.getsizeof(row) for row in r) for r in rows) / len(rows)
+    raw_bytes = sum(sys.getsizeof(c.to_raw()) for c in chunks) / len(chunks) + 48  # + object header
+    chunk_bytes = sum(memory(c) for c in chunks) / len(chunks)
+    print(f"Memory per chunk: nested lists {list_bytes:.0f} bytes, raw bytearray {raw_bytes:.0f} bytes, "
+          f"palette {chunk_bytes:.0f} bytes ({list_bytes / chunk_bytes:.1f}x smaller than lists)")
+
+    def bench(label, payloads):
+        messages = [{"type": "chunk_data", "cx": 0, "cy": 0, "data": p} for p in payloads]
+        start = time.perf_counter()
+        for _ in range(5):
+            encoded = [pickle.dumps(m) for m in messages]
+        dump_time = (time.perf_counter() - start) / (5 * len(messages))
+        start = time.perf_counter()
+        for _ in range(5):
+            for e in encoded:
+                pickle.loads(e)
+        load_time = (time.perf_counter() - start) / (5 * len(messages))
+        size = sum(len(e) for e in encoded) / len(encoded)
+        print(f"{label:14s} {size:6.0f} bytes/message, dumps {dump_time * 1e6:6.2f} us, loads {load_time * 1e6:6.2f} us")
+        return size
+
+    print(f"chunk_data messages ({len(chunks)} chunks):")
+    old = bench("nested lists", rows)
+    bench("raw bytes", [bytes(c.to_raw()) for c in chunks])
+    new = bench("palette", [c.to_bytes() for c in chunks])
+    print(f"Wire size {old / new:.1f}x smaller than nested lists")
+
+    start = time.perf_counter()
+    for _ in range(20):
+        for chunk in chunks:
+            Chunk.from_bytes(chunk.to_bytes())
+    print(f"Encode + decode: {(time.perf_counter() - start) / (20 * len(chunks)) * 1e6:.2f} us/chunk")
+    start = time.perf_counter()
+    for chunk in chunks[:200]:
+        for ly in range(CHUNK_SIZE):
+            for lx in range(CHUNK_SIZE):
+                chunk.get(lx, ly)
+    print(f"get(): {(time.perf_counter() - start) / (200 * CHUNK_AREA) * 1e9:.0f} ns/tile")
@@ -0,0 +1,275 @@
+import random
+import signal
+import sys
+import threading
+from collections import OrderedDict
+
+from terrain_noise import value_noise_batch, fractal_noise_batch
+from world_chunk import Chunk
+from game_data import BLOCK_REGISTRY, DIRT_TILE, STONE_TILE, GRASS_TILE, SAND_TILE, WOOD_TILE, LEAF_TILE, GRAVEL_TILE, COAL_ORE_TILE, COPPER_ORE_TILE, OBSIDIAN_TILE, SNOW_TILE, ICE_TILE, DARK_OAK_WOOD_TILE, DARK_OAK_LEAF_TILE, CACTUS_TILE
+
+# =====================
+# CONSTANTS
+# =====================
+CHUNK_SIZE = 16
+
+# Memory cap for the column cache (heights + biomes per global_x)
+COLUMN_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# =====================
+# TERRAIN COLUMNS
+# =====================
+# !!!!!!! really important the below needs to be fixed so that the biome actually changes
+def biome_from_noise(biome_noise):
+    """Map biome noise to a biome name"""
+    # Determine biome with smooth ranges
+    if biome_noise > 110:
+        return "desert"
+    elif biome_noise > 70:
+        return "plains"
+    elif biome_noise > 30:
+        return "forest"
+    elif biome_noise > -10:
+        return "mountain"
+    else:
+        return "ice_plains"
+
+def height_from_fractal(fractal, biome):
+    """Map terrain fractal noise to a height for the biome"""
+    if biome == "mountain":
+        # Mountains: very bumpy and chaotic
+        return int(13 + fractal * 12)
+    elif biome == "desert":
+        # Desert: mostly flat with occasional bumps
+        return int(9 + fractal * 1.5)
+    elif biome == "ice_plains":
+        # Ice: very flat but with small random bumps
+        return int(10 + fractal * 0.8)
+    elif biome == "plains":
+        # Plains: gently rolling with randomness
+        return int(9 + fractal * 3)
+    else:
+        # Forest: moderately bumpy
+        return int(9 + fractal * 5)
+
+def compute_span(span_x):
+    """Compute heights and biomes for the CHUNK_SIZE columns of one chunk column.
+
+    Uses the batch noise API, which is bit-identical to the scalar noise
+    (python terrain_noise.py checks it).
+    """
+    xs = range(span_x * CHUNK_SIZE, (span_x + 1) * CHUNK_SIZE)
+    # Biome: large scale noise for regions, less interpolation for more variation
+    biome_a = value_noise_batch(xs, 300)
+    biome_b = value_noise_batch([x + 5000 for x in xs], 150)
+    # Height: fractal noise for bumpy, chaotic terrain
+    fractals = fractal_noise_batch(xs, octaves=5, persistence=0.6, scale=30)
+
+    biomes = tuple(biome_from_noise(a * 100 + b * 50) for a, b in zip(biome_a, biome_b))
+    heights = tuple(height_from_fractal(f, biome) for f, biome in zip(fractals, biomes))
+    return heights, biomes
+
+# Rough resident size of one cached span: two tuples, the pair holding them and
+# the OrderedDict entry. Heights are small ints and biomes are shared strings.
+SPAN_BYTES = 2 * sys.getsizeof(tuple(range(CHUNK_SIZE))) + sys.getsizeof((0, 0)) + 100
+
+class ColumnCache:
+    """LRU cache of terrain heights and biomes keyed by chunk column.
+
+    Heights and biomes only depend on global_x, so every chunk in a vertical
+    stack (and tree placement, and the debug overlay) can share one lookup.
+    Columns are filled a whole chunk-width span at a time.
+    """
+
+    def __init__(self, max_bytes=COLUMN_CACHE_MAX_BYTES):
+        self.spans = OrderedDict()  # {span_x: (heights, biomes)}
+        self.max_spans = max(1, max_bytes // SPAN_BYTES)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_span(self, span_x):
+        """Get (heights, biomes) tuples for the chunk column span_x"""
+        with self.lock:
+            span = self.spans.get(span_x)
+            if span is not None:
+                self.spans.move_to_end(span_x)
+                self.hits += 1
+                return span
+            self.misses += 1
+
+        # Compute outside the lock so other threads aren't blocked on noise
+        span = compute_span(span_x)
+
+        with self.lock:
+            self.spans[span_x] = span
+            while len(self.spans) > self.max_spans:
+                self.spans.popitem(last=False)
+                self.evictions += 1
+        return span
+
+    def get_column(self, global_x):
+        """Get (height, biome) for a single global_x"""
+        heights, biomes = self.get_span(global_x // CHUNK_SIZE)
+        i = global_x % CHUNK_SIZE
+        return heights[i], biomes[i]
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "spans": len(self.spans),
+            "max_spans": self.max_spans,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate()
+        }
+
+column_cache = ColumnCache()
+
+def get_biome(global_x):
+    """Biome at global_x (cached)"""
+    return column_cache.get_column(global_x)[1]
+
+def get_height(global_x):
+    """Terrain height at global_x (cached)"""
+    return column_cache.get_column(global_x)[0]
+
+# =====================
+# CHUNK GENERATION
+# =====================
+def generate_chunk_counted(cx, cy, seed=0):
+    """generate_chunk plus the column cache hits and misses it caused.
+
+    For generation in a worker process, whose column cache the server
+    can't see: the counts travel back with the chunk.
+    """
+    hits, misses = column_cache.hits, column_cache.misses
+    chunk = generate_chunk(cx, cy, seed)
+    return chunk, column_cache.hits - hits, column_cache.misses - misses
+
+def chunk_rng(seed, cx, cy):
+    """Per-chunk random generator so a chunk always generates the same way for a seed"""
+    # String seeds are hashed with SHA-512 by random.Random, so this is stable
+    # across runs and platforms (unlike hash())
+    return random.Random(f"{seed}:{cx}:{cy}")
+
+def generate_tree(tiles, x, y, biome="forest", rng=random):
+    """Generate a tree based on biome (tiles is a chunk's flat row-major bytearray)"""
+    if biome == "forest":
+        # Normal oak tree
+        height = rng.randint(4, 6)
+        for i in range(height):
+            if y - i >= 0:
+                tiles[(y - i) * CHUNK_SIZE + x] = WOOD_TILE
+
+        leaf_start = y - height
+        for lx in range(-2, 3):
+            for ly in range(-2, 3):
+                if abs(lx) + abs(ly) < 4:
+                    tx = x + lx
+                    ty = leaf_start + ly
+                    if 0 <= tx < CHUNK_SIZE and 0 <= ty < CHUNK_SIZE:
+                        if not BLOCK_REGISTRY.solid[tiles[ty * CHUNK_SIZE + tx]]:
+                            tiles[ty * CHUNK_SIZE + tx] = LEAF_TILE
+
+    elif biome == "mountain":
+        # Tall dark oak tree
+        height = rng.randint(6, 9)
+        for i in range(height):
+            if y - i >= 0:
+                tiles[(y - i) * CHUNK_SIZE + x] = DARK_OAK_WOOD_TILE
+
+        leaf_start = y - height
+        for lx in range(-2, 3):
+            for ly in range(-3, 3):
+                if abs(lx) + abs(ly) < 5:
+                    tx = x + lx
+                    ty = leaf_start + ly
+                    if 0 <= tx < CHUNK_SIZE and 0 <= ty < CHUNK_SIZE:
+                        if not BLOCK_REGISTRY.solid[tiles[ty * CHUNK_SIZE + tx]]:
+                            tiles[ty * CHUNK_SIZE + tx] = DARK_OAK_LEAF_TILE
+
+    elif biome == "desert":
+        # Cactus instead of trees
+        height = rng.randint(2, 4)
+        for i in range(height):
+            if y - i >= 0:
+                tiles[(y - i) * CHUNK_SIZE + x] = CACTUS_TILE
+
+def generate_chunk(cx, cy, seed=0):
+    """Generate a chunk with biome-specific features (deterministic for a given seed)"""
+    rng = chunk_rng(seed, cx, cy)
+    tiles = bytearray(CHUNK_SIZE * CHUNK_SIZE)  # Raw ids, palette-packed at the end
+    heights, biomes = column_cache.get_span(cx)
+
+    for y in range(CHUNK_SIZE):
+        for x in range(CHUNK_SIZE):
+            i = y * CHUNK_SIZE + x
+            global_y = cy * CHUNK_SIZE + y
+            ground_height = heights[x]
+            biome = biomes[x]
+
+            if global_y > ground_height:
+                # Surface block
+                if global_y == ground_height + 1:
+                    if biome == "desert":
+                        tiles[i] = SAND_TILE
+                    elif biome == "ice_plains":
+                        tiles[i] = SNOW_TILE if rng.random() < 0.8 else ICE_TILE
+                    elif biome == "mountain":
+                        tiles[i] = STONE_TILE if rng.random() < 0.6 else GRAVEL_TILE
+                    else:  # plains and forest
+                        tiles[i] = GRASS_TILE
+
+                # Underground blocks
+                elif global_y > ground_height + 4:
+                    if biome == "desert":
+                        tiles[i] = SAND_TILE if rng.random() < 0.7 else GRAVEL_TILE
+                    elif biome == "ice_plains":
+                        tiles[i] = ICE_TILE
+                    else:
+                        # Stone with ores
+                        if rng.random() < 0.05:
+                            tiles[i] = COAL_ORE_TILE
+                        elif rng.random() < 0.02:
+                            tiles[i] = COPPER_ORE_TILE
+                        elif rng.random() < 0.01 and global_y > ground_height + 10:
+                            tiles[i] = OBSIDIAN_TILE
+                        else:
+                            tiles[i] = STONE_TILE if rng.random() < 0.8 else DIRT_TILE
+                else:
+                    tiles[i] = DIRT_TILE
+
+    # Add trees and vegetation
+    for x in range(CHUNK_SIZE):
+        ground_y = heights[x]
+        local_y = ground_y - cy * CHUNK_SIZE
+        biome = biomes[x]
+
+        if 0 <= local_y < CHUNK_SIZE:
+            # Forest biome has more trees
+            if biome == "forest" and rng.random() < 0.06:
+                generate_tree(tiles, x, local_y, biome, rng)
+            # Mountain biome has some trees
+            elif biome == "mountain" and rng.random() < 0.03:
+                generate_tree(tiles, x, local_y, biome, rng)
+            # Desert has cacti
+            elif biome == "desert" and rng.random() < 0.05:
+                generate_tree(tiles, x, local_y, biome, rng)
+
+    return Chunk(tiles)
+
+def generate_chunk_column(cx, cy_values, seed=0):
+    """Generate several chunks in one chunk column (shares the column cache span)"""
+    return [generate_chunk(cx, cy, seed) for cy in cy_values]
+
+def ignore_interrupts():
+    """Initializer for generation worker processes: Ctrl-C is the parent's to handle"""
+    # Workers share the terminal's process group, so they get SIGINT too and
+    # would otherwise die mid-job with a traceback each, breaking the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
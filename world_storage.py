@@ -0,0 +1,233 @@
+import os
+import json
+import mmap
+import struct
+import threading
+
+from world_chunk import Chunk
+
+# =====================
+# REGION FORMAT
+# =====================
+# A region file holds REGION_SIZE x REGION_SIZE chunks:
+#   magic + version, then a fixed table of (offset, length, capacity) per chunk,
+#   then chunk records. A chunk is rewritten in place if it still fits its
+#   capacity, otherwise it is appended at the end of the file.
+REGION_SIZE = 32
+REGION_MAGIC = b"WZRG"
+REGION_VERSION = 1
+HEADER_PREFIX = struct.Struct("<4sI")
+HEADER_ENTRY = struct.Struct("<III")
+HEADER_SIZE = HEADER_PREFIX.size + REGION_SIZE * REGION_SIZE * HEADER_ENTRY.size
+SECTOR_SIZE = 64  # Chunk records are allocated in multiples of this (uniform chunks need 3 bytes)
+
+class RegionFile:
+    """One region file, read through mmap and written with plain file writes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(HEADER_PREFIX.pack(REGION_MAGIC, REGION_VERSION))
+                f.write(bytes(HEADER_SIZE - HEADER_PREFIX.size))
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER_PREFIX.unpack_from(self.map, 0)
+        if magic != REGION_MAGIC or version != REGION_VERSION:
+            raise ValueError(f"{path} is not a version {REGION_VERSION} region file")
+
+    def _entry(self, index):
+        return HEADER_ENTRY.unpack_from(self.map, HEADER_PREFIX.size + index * HEADER_ENTRY.size)
+
+    def has(self, index):
+        with self.lock:
+            return self._entry(index)[1] > 0
+
+    def indices(self):
+        """Indices of every chunk stored in this region"""
+        with self.lock:
+            return [i for i in range(REGION_SIZE * REGION_SIZE) if self._entry(i)[1] > 0]
+
+    def read(self, index):
+        """Chunk at index, or None. Copies straight from the mapping into the chunk."""
+        with self.lock:
+            offset, length, _ = self._entry(index)
+            if length == 0:
+                return None
+            with memoryview(self.map) as view:
+                with view[offset:offset + length] as record:
+                    return Chunk.from_bytes(record)
+
+    def write_many(self, records, sync=True):
+        """Write [(index, data), ...] and update the offset table in one pass"""
+        with self.lock:
+            self.file.seek(0, os.SEEK_END)
+            end = self.file.tell()
+            entries = []
+            for index, data in records:
+                offset, _, capacity = self._entry(index)
+                length = len(data)
+                if length > capacity:
+                    # Doesn't fit the old slot: append a new one
+                    capacity = -(-length // SECTOR_SIZE) * SECTOR_SIZE
+                    offset = end
+                    end += capacity
+                    data = data + bytes(capacity - length)
+                self.file.seek(offset)
+                self.file.write(data)
+                entries.append((index, offset, length, capacity))
+
+            # Data first, then the table, so a crash never points at unwritten data
+            self.file.flush()
+            for index, offset, length, capacity in entries:
+                self.file.seek(HEADER_PREFIX.size + index * HEADER_ENTRY.size)
+                self.file.write(HEADER_ENTRY.pack(offset, length, capacity))
+            self.file.flush()
+            if sync:
+                os.fsync(self.file.fileno())
+
+            if end > len(self.map):
+                # File grew past the mapping
+                self.map.close()
+                self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        with self.lock:
+            self.map.close()
+            self.file.close()
+
+class WorldStorage:
+    """On-disk world: world.json metadata (seed) plus region files of chunks"""
+
+    def __init__(self, path="world"):
+        self.path = path
+        self.region_dir = os.path.join(path, "regions")
+        os.makedirs(self.region_dir, exist_ok=True)
+        self.meta_path = os.path.join(path, "world.json")
+        self.regions = {}  # {(rx, ry): RegionFile} open regions
+        self.regions_lock = threading.Lock()
+
+    # =====================
+    # METADATA
+    # =====================
+    def load_meta(self):
+        """Load world metadata, or {} for a new world"""
+        try:
+            with open(self.meta_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_meta(self, meta):
+        # Write then rename so an interrupted save never leaves a torn file
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.meta_path)
+
+    # =====================
+    # CHUNKS
+    # =====================
+    def region_path(self, rx, ry):
+        return os.path.join(self.region_dir, f"r.{rx}.{ry}.dat")
+
+    def _region(self, cx, cy, create):
+        """(RegionFile, index) for a chunk, or (None, index) if the region doesn't exist"""
+        rx, ry = cx // REGION_SIZE, cy // REGION_SIZE
+        index = (cy % REGION_SIZE) * REGION_SIZE + (cx % REGION_SIZE)
+        with self.regions_lock:
+            region = self.regions.get((rx, ry))
+            if region is None:
+                path = self.region_path(rx, ry)
+                if not create and not os.path.exists(path):
+                    return None, index
+                region = RegionFile(path)
+                self.regions[(rx, ry)] = region
+        return region, index
+
+    def has_chunk(self, cx, cy):
+        region, index = self._region(cx, cy, create=False)
+        return region is not None and region.has(index)
+
+    def load_chunk(self, cx, cy):
+        """Load a saved chunk, or None if it was never saved"""
+        region, index = self._region(cx, cy, create=False)
+        if region is None:
+            return None
+        return region.read(index)
+
+    def save_chunk(self, cx, cy, chunk):
+        self.save_chunks([((cx, cy), chunk.to_bytes())])
+
+    def save_chunks(self, items, sync=True):
+        """Save [((cx, cy), data bytes), ...] with one write pass per region"""
+        by_region = {}
+        for (cx, cy), data in items:
+            region, index = self._region(cx, cy, create=True)
+            by_region.setdefault(region, []).append((index, data))
+        for region, records in by_region.items():
+            region.write_many(records, sync=sync)
+
+    def saved_chunks(self):
+        """Set of (cx, cy) for every chunk on disk"""
+        saved = set()
+        for name in os.listdir(self.region_dir):
+            parts = name.split(".")
+            if len(parts) != 4 or parts[0] != "r" or parts[3] != "dat":
+                continue
+            rx, ry = int(parts[1]), int(parts[2])
+            region, _ = self._region(rx * REGION_SIZE, ry * REGION_SIZE, create=False)
+            for index in region.indices():
+                saved.add((rx * REGION_SIZE + index % REGION_SIZE, ry * REGION_SIZE + index // REGION_SIZE))
+        return saved
+
+    def close(self):
+        with self.regions_lock:
+            for region in self.regions.values():
+                region.close()
+            self.regions.clear()
+
+
+if __name__ == "__main__":
+    # Save/load throughput benchmark: python world_storage.py
+    import shutil
+    import tempfile
+    import time
+
+    from world_gen import generate_chunk_column
+
+    columns, rows = 64, 16
+    chunks = []
+    for cx in range(columns):
+        for cy, chunk in zip(range(rows), generate_chunk_column(cx, range(rows), seed=1)):
+            chunks.append(((cx, cy), chunk.to_bytes()))
+    total_bytes = sum(len(data) for _, data in chunks)
+
+    path = tempfile.mkdtemp()
+    try:
+        storage = WorldStorage(path)
+        start = time.perf_counter()
+        storage.save_chunks(chunks)
+        elapsed = time.perf_counter() - start
+        print(f"Save {len(chunks)} chunks, bulk (fsync per region): {len(chunks) / elapsed:9.0f} chunks/s, "
+              f"{total_bytes / elapsed / 1e6:6.1f} MB/s")
+
+        start = time.perf_counter()
+        for key, data in chunks:
+            storage.save_chunks([(key, data)], sync=False)
+        elapsed = time.perf_counter() - start
+        print(f"Save {len(chunks)} chunks, one at a time (no fsync): {len(chunks) / elapsed:9.0f} chunks/s")
+        storage.close()
+
+        storage = WorldStorage(path)
+        start = time.perf_counter()
+        for (cx, cy), data in chunks:
+            assert storage.load_chunk(cx, cy).to_bytes() == data
+        elapsed = time.perf_counter() - start
+        print(f"Load {len(chunks)} chunks (mmap): {len(chunks) / elapsed:9.0f} chunks/s, "
+              f"{total_bytes / elapsed / 1e6:6.1f} MB/s")
+        assert storage.saved_chunks() == {key for key, _ in chunks}
+        storage.close()
+    finally:
+        shutil.rmtree(path)